@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Cómo se veía analisis.json en cada fecha pasada, calculado de una pasada.
+
+Correr generar_analisis una vez por día del historial es cuadrático: cada día
+vuelve a contar sus 30 sorteos. Acá se ordenan una sola vez los sorteos de cada
+juego como los recorre extraer_sorteos_juego (fechas de la más nueva a la más
+vieja y, dentro del día, en el orden de historial.json) y se arma la matriz de
+conteos acumulados desde el final:
+
+    acumulado[i][n] = veces que salió el número n en los sorteos i, i+1, ...
+
+Para una fecha, sus sorteos empiezan en la posición q del primero de ese día y
+la ventana es una resta de dos filas:
+
+    ventana   = acumulado[q] - acumulado[q + 30]
+    recientes = acumulado[q] - acumulado[q + 7]
+
+Counter.most_common desempata por orden de primera aparición en la ventana, así
+que también se lleva, barriendo hacia atrás, la próxima posición de cada número
+desde q: es su primera aparición dentro de la ventana.
+
+El resultado va a analisis_historico/, un archivo por mes con una fecha por
+línea, como historial/. El frontend busca una fecha en su mes:
+
+    analisis_historico/2026-08.json
+    {"2026-08-22": {"pega_3": {"mas_frecuentes": [...], ...}}, ...}
+
+Cada entrada usa la ventana de SORTEOS_A_ANALIZAR (30) sorteos y los 7 más
+recientes, como analisis.json. Solo se reescriben los meses cuyo contenido
+cambió: con un sorteo nuevo, en general solo el mes en curso.
+
+    python analisis_historico.py [--verificar]
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+
+import numpy as np
+
+from analizador import (JUEGOS, SORTEOS_A_ANALIZAR, _describir_patrones, _describir_tendencias,
+                        analizar_juego, cargar_historial, extraer_numeros, extraer_sorteos_juego)
+
+DIRECTORIO = "analisis_historico"
+
+# Los mismos cortes que analizar_juego
+RECIENTES = 7
+TOP_FRECUENTES = 8
+TOP_RECIENTES = 5
+
+
+def _sorteos_ordenados(historial: dict, prefijos: tuple) -> list:
+    return extraer_sorteos_juego(historial, prefijos, ventana=None)
+
+
+def _acumulados(sorteos: list, slug: str):
+    """(vocabulario, fichas por sorteo, matriz de conteos acumulados desde el final)."""
+    vocabulario, ids = [], {}
+    fichas = []
+    for s in sorteos:
+        fila = []
+        for n in extraer_numeros([s], slug):
+            if n not in ids:
+                ids[n] = len(vocabulario)
+                vocabulario.append(n)
+            fila.append(ids[n])
+        fichas.append(fila)
+
+    conteos = np.zeros((len(sorteos) + 1, len(vocabulario)), dtype=np.int32)
+    for i in range(len(sorteos) - 1, -1, -1):
+        conteos[i] = conteos[i + 1]
+        np.add.at(conteos[i], fichas[i], 1)
+    return vocabulario, fichas, conteos
+
+
+def _orden(conteo: np.ndarray, primera: np.ndarray) -> np.ndarray:
+    """Ids con conteo > 0 en el orden de Counter.most_common."""
+    presentes = np.flatnonzero(conteo)
+    return presentes[np.lexsort((primera[presentes], -conteo[presentes]))]
+
+
+def historico_juego(historial: dict, slug: str, fechas: list,
+                    ventana: int = SORTEOS_A_ANALIZAR) -> dict:
+    """{fecha: análisis} para cada fecha de `fechas` (en orden) con sorteos previos."""
+    sorteos = _sorteos_ordenados(historial, JUEGOS[slug][1])
+    if not sorteos:
+        return {}
+    vocabulario, fichas, acumulado = _acumulados(sorteos, slug)
+    total = len(sorteos)
+
+    # Posición de cada número en la secuencia aplanada: desempata como Counter
+    ficha_inicio = np.cumsum([0] + [len(f) for f in fichas])
+    proxima = np.full(len(vocabulario), np.iinfo(np.int64).max, dtype=np.int64)
+
+    resultado = {}
+    q = total  # primer sorteo con fecha <= la fecha en curso
+    for fecha in sorted(fechas):
+        # Se incorporan los sorteos de la fecha: barrido hacia atrás
+        while q > 0 and sorteos[q - 1]["fecha"] <= fecha:
+            q -= 1
+            for j in range(len(fichas[q]) - 1, -1, -1):
+                proxima[fichas[q][j]] = ficha_inicio[q] + j
+        if q == total:
+            continue
+
+        fin = min(q + ventana, total)
+        conteo = acumulado[q] - acumulado[fin]
+        reciente = acumulado[q] - acumulado[min(q + RECIENTES, total)]
+
+        orden = _orden(conteo, proxima)
+        mas = [vocabulario[i] for i in orden[:TOP_FRECUENTES]]
+        menos = [vocabulario[i] for i in orden[::-1][:TOP_FRECUENTES]]
+        recientes = [vocabulario[i] for i in _orden(reciente, proxima)[:TOP_RECIENTES]]
+
+        freq = Counter({vocabulario[i]: int(conteo[i]) for i in orden})
+        resultado[fecha] = {
+            "mas_frecuentes":     mas,
+            "veces":              [freq[n] for n in mas],
+            "menos_frecuentes":   menos,
+            "recientes":          recientes,
+            "patrones":           _describir_patrones(freq, mas),
+            "tendencias":         _describir_tendencias(recientes, mas),
+            "sorteos_analizados": fin - q,
+        }
+    return resultado
+
+
+def generar_historico(historial: dict) -> dict:
+    """{fecha: {juego: análisis}} para cada fecha del historial."""
+    fechas = sorted(historial)
+    por_fecha = {f: {} for f in fechas}
+    for slug in JUEGOS:
+        for fecha, analisis in historico_juego(historial, slug, fechas).items():
+            por_fecha[fecha][slug] = analisis
+    return {f: juegos for f, juegos in por_fecha.items() if juegos}
+
+
+def escribir(historico: dict, directorio: str = DIRECTORIO) -> list:
+    """Un archivo por mes, una fecha por línea. Retorna los meses que cambiaron."""
+    os.makedirs(directorio, exist_ok=True)
+    meses = {}
+    for fecha in sorted(historico):
+        meses.setdefault(fecha[:7], []).append(fecha)
+
+    escritos = []
+    for mes, fechas in meses.items():
+        lineas = [f"{json.dumps(f)}:{json.dumps(historico[f], ensure_ascii=False, separators=(',', ':'))}"
+                  for f in fechas]
+        texto = "{\n" + ",\n".join(lineas) + "\n}\n"
+        ruta = os.path.join(directorio, f"{mes}.json")
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                if f.read() == texto:
+                    continue
+        except FileNotFoundError:
+            pass
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(texto)
+        escritos.append(mes)
+    return escritos
+
+
+def verificar(historial: dict, historico: dict) -> list:
+    """Compara cada fecha contra analizar_juego sobre el historial cortado a esa
+    fecha (la forma cuadrática). Retorna las diferencias."""
+    diferencias = []
+    for fecha in sorted(historial):
+        for slug, (nombre, prefijos) in JUEGOS.items():
+            sorteos = extraer_sorteos_juego(historial, prefijos, hasta=fecha)
+            guardado = historico.get(fecha, {}).get(slug)
+            if not sorteos:
+                if guardado:
+                    diferencias.append(f"{fecha}/{slug}: sobra, no había sorteos")
+                continue
+            if not guardado:
+                diferencias.append(f"{fecha}/{slug}: falta")
+                continue
+
+            esperado = analizar_juego(slug, nombre, sorteos)
+            freq = Counter(extraer_numeros(sorteos, slug))
+            esperado["mas_frecuentes"] = [n for n, _ in freq.most_common(TOP_FRECUENTES)]
+            esperado["menos_frecuentes"] = [n for n, _ in freq.most_common()[:-TOP_FRECUENTES - 1:-1]]
+            esperado["recientes"] = [n for n, _ in Counter(
+                extraer_numeros(sorteos[:RECIENTES], slug)).most_common(TOP_RECIENTES)]
+            for campo in ("mas_frecuentes", "menos_frecuentes", "recientes",
+                          "patrones", "tendencias", "sorteos_analizados"):
+                if esperado[campo] != guardado[campo]:
+                    diferencias.append(f"{fecha}/{slug}.{campo}: {guardado[campo]} ≠ {esperado[campo]}")
+    return diferencias
+
+
+def main():
+    print("🕰️  ANÁLISIS HISTÓRICO POR FECHA")
+    historial = cargar_historial()
+    if not historial:
+        print("❌ Historial vacío, abortando.")
+        return False
+
+    historico = generar_historico(historial)
+    print(f"   📅 {len(historico)} fechas analizadas")
+
+    if "--verificar" in sys.argv:
+        diferencias = verificar(historial, historico)
+        for d in diferencias[:50]:
+            print(f"   · {d}")
+        if diferencias:
+            print(f"❌ {len(diferencias)} diferencia(s) con analizar_juego")
+            return False
+        print("✅ Coincide con analizar_juego en todas las fechas")
+
+    escritos = escribir(historico)
+    if escritos:
+        print(f"💾 {DIRECTORIO}/: {len(escritos)} mes(es) reescrito(s): {', '.join(escritos)}")
+    else:
+        print(f"ℹ️  {DIRECTORIO}/ ya estaba al día")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,8 +1,16 @@
+import hashlib
 import json
 import os
 import random
+import sys
+import threading
 from collections import Counter
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import historial_mensual
+from indice_combinaciones import INDICE, IndiceCombinaciones
+from perfilado import Perfil
 
 
 HISTORIAL_URL = "https://raw.githubusercontent.com/jzuniga1995/lotohn/main/historial.json"
@@ -20,17 +28,19 @@ JUEGOS = {
 SORTEOS_A_ANALIZAR = 30
 
 
-def cargar_historial() -> dict:
+def cargar_historial(desde: str = None, hasta: str = None, suficiente=None) -> dict:
+    """Historial local leyendo solo los meses de historial/ que hacen falta (ver
+    historial_mensual.cargar). Sin historial local, el remoto completo."""
     # El local manda: en el workflow el scraper acaba de escribirlo y el remoto
     # todavía es el de la corrida anterior, así que bajarlo analizaba datos viejos
-    if os.path.exists("historial.json"):
-        try:
-            with open("historial.json", "r", encoding="utf-8") as f:
-                historial = json.load(f)
-            print(f"   📂 historial.json local: {len(historial)} días")
+    try:
+        historial = historial_mensual.cargar(desde, hasta, suficiente)
+        if historial:
+            meses = len({f[:7] for f in historial})
+            print(f"   📂 {historial_mensual.DIRECTORIO}/ local: {len(historial)} días ({meses} meses)")
             return historial
-        except Exception as e:
-            print(f"⚠️  No se pudo leer historial.json local: {e}")
+    except Exception as e:
+        print(f"⚠️  No se pudo leer el historial local: {e}")
 
     try:
         import requests
@@ -44,15 +54,30 @@ def cargar_historial() -> dict:
     return {}
 
 
-def extraer_sorteos_juego(historial: dict, prefijos: tuple) -> list:
+def cargar_ultimos(ventana: int = SORTEOS_A_ANALIZAR) -> dict:
+    """Solo los meses más nuevos que hacen falta para `ventana` sorteos de cada juego."""
+    def suficiente(historial):
+        return all(len(extraer_sorteos_juego(historial, prefijos, ventana)) >= ventana
+                   for _, prefijos in JUEGOS.values())
+    return cargar_historial(suficiente=suficiente)
+
+
+def extraer_sorteos_juego(historial: dict, prefijos: tuple, ventana: int = SORTEOS_A_ANALIZAR,
+                          tanda: str = None, desde: str = None, hasta: str = None) -> list:
+    """Los `ventana` sorteos más recientes del juego (None = todos), opcionalmente
+    de una sola tanda ('11am', '9pm'...) y entre dos fechas YYYY-MM-DD."""
     resultados = []
     for fecha in sorted(historial.keys(), reverse=True):
+        if (hasta and fecha > hasta) or (desde and fecha < desde):
+            continue
         for key, nums in historial[fecha].items():
+            if tanda and not key.endswith(tanda):
+                continue
             if key.startswith(prefijos) and isinstance(nums, list) and nums:
                 resultados.append({"fecha": fecha, "key": key, "nums": nums})
-        if len(resultados) >= SORTEOS_A_ANALIZAR:
+        if ventana and len(resultados) >= ventana:
             break
-    return resultados[:SORTEOS_A_ANALIZAR]
+    return resultados[:ventana] if ventana else resultados
 
 
 def extraer_numeros(sorteos: list, slug: str) -> list:
@@ -125,18 +150,19 @@ def _generar_sugerencias(slug: str, top: list, freq: Counter) -> list:
         # 3 números de 2 dígitos separados por guión
         sugs = []
         usados = list(pool)
-        random.seed(42)
+        # Generador propio: no se toca el estado global de `random`
+        rng = random.Random(42)
         for i in range(3):
-            sample = random.sample(usados, min(3, len(usados)))
+            sample = rng.sample(usados, min(3, len(usados)))
             sugs.append('-'.join(sorted(sample)))
         return sugs
 
     if slug == 'premia2':
         # 2 números de 2 dígitos separados por guión
         sugs = []
-        random.seed(7)
+        rng = random.Random(7)
         for i in range(3):
-            sample = random.sample(pool, min(2, len(pool)))
+            sample = rng.sample(pool, min(2, len(pool)))
             sugs.append('-'.join(sorted(sample)))
         return sugs
 
@@ -150,8 +176,7 @@ def _generar_sugerencias(slug: str, top: list, freq: Counter) -> list:
         # completar con números del rango si faltan
         todos_rango = [f"{i:02d}" for i in range(1, 34)]
         extra = [n for n in todos_rango if n not in validos]
-        random.seed(13)
-        random.shuffle(extra)
+        random.Random(13).shuffle(extra)
         combinado = (validos + extra)[:18]
         sugs = []
         for i in range(3):
@@ -172,9 +197,169 @@ def _fallback(slug: str, n: int) -> dict:
     }
 
 
+# ============================================
+# CONSULTAS DE COMBINACIONES (Súper Premio y Pega 3)
+# ============================================
+
+_indice = None
+
+
+def cargar_indice(recargar: bool = False) -> IndiceCombinaciones:
+    global _indice
+    if _indice is None or recargar:
+        _indice = IndiceCombinaciones.cargar(INDICE)
+    return _indice
+
+
+def combinacion_ya_salio(juego: str, numeros) -> list:
+    """[(fecha, key, números)] de los sorteos con exactamente esa combinación.
+
+    juego: 'super_premio' o 'pega_3'. El orden de los números no importa."""
+    return cargar_indice().ya_salio(juego, numeros)
+
+
+def sorteos_con_numeros(juego: str, numeros) -> list:
+    """[(fecha, key, números)] de los sorteos que traen todos esos números."""
+    return cargar_indice().salieron_juntos(juego, numeros)
+
+
+def ultima_vez_juntos(juego: str, numeros):
+    """(fecha, key, números) del último sorteo con todos esos números, o None."""
+    return cargar_indice().ultima_vez_juntos(juego, numeros)
+
+
+# ============================================
+# CONSULTAS A DEMANDA (meses de historial/ residentes + caché LRU)
+# ============================================
+
+ESTADISTICAS = ('analisis', 'frecuencias', 'sorteos', 'numero')
+
+
+class _Version:
+    """Un mes de historial/ tal como se cargó. Se hashea por identidad: va en la
+    clave de la caché, así lo calculado sobre una versión vieja nunca se sirve
+    para la nueva."""
+
+    __slots__ = ('historial', 'numero')
+
+    def __init__(self, historial: dict, numero: int):
+        self.historial = historial
+        self.numero = numero
+
+
+class ConsultasAnalisis:
+    """El analizador como biblioteca: mantiene en memoria los meses de historial/
+    que piden las consultas y memoriza cada consulta (juego, ventana,
+    estadística, filtros).
+
+    Solo se leen los meses que la consulta necesita: los de `desde`..`hasta` y,
+    con ventana, del más nuevo al más viejo hasta juntar esa cantidad de
+    sorteos. Cada mes se relee solo si su archivo cambió: primero se mira mtime
+    y tamaño, y si cambiaron se compara el hash del contenido, así un `touch` o
+    una reescritura idéntica no vacían la caché. La clave de cada consulta lleva
+    las versiones de los meses que usó, y calcula sobre ellas hasta el final
+    aunque a mitad de camino se recargue alguno. Los resultados se comparten
+    entre consultas: no hay que modificarlos."""
+
+    def __init__(self, directorio: str = historial_mensual.DIRECTORIO, max_consultas: int = 512):
+        self.directorio = directorio
+        self.recargas = 0
+        self._meses = {}   # mes -> _Version
+        self._firmas = {}  # mes -> ((mtime_ns, tamaño), sha256)
+        self._lock = threading.Lock()
+        self._consultar = lru_cache(maxsize=max_consultas)(self._calcular)
+        historial_mensual.migrar(directorio)
+
+    def _mes(self, mes: str) -> _Version | None:
+        """La versión vigente de un mes, releyéndolo si su archivo cambió."""
+        ruta = os.path.join(self.directorio, f"{mes}.json")
+        with self._lock:
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                self._meses.pop(mes, None)
+                self._firmas.pop(mes, None)
+                return None
+            firma = (st.st_mtime_ns, st.st_size)
+            anterior, digest_anterior = self._firmas.get(mes, (None, None))
+            if firma != anterior:
+                with open(ruta, "rb") as f:
+                    crudo = f.read()
+                digest = hashlib.sha256(crudo).hexdigest()
+                if digest != digest_anterior:
+                    numero = self._meses[mes].numero + 1 if mes in self._meses else 1
+                    # Lo calculado sobre la versión anterior queda inalcanzable
+                    # y el LRU lo desaloja; lo de los otros meses sigue sirviendo
+                    self._meses[mes] = _Version(json.loads(crudo), numero)
+                    self.recargas += 1
+                self._firmas[mes] = (firma, digest)
+            return self._meses[mes]
+
+    def _vigentes(self, prefijos: tuple, ventana, tanda, desde, hasta) -> tuple:
+        """Versiones de los meses que necesita la consulta, del más nuevo al más viejo."""
+        elegidos, sorteos = [], 0
+        for mes in reversed(historial_mensual.meses(self.directorio)):
+            if (hasta and mes > hasta[:7]) or (desde and mes < desde[:7]):
+                continue
+            version = self._mes(mes)
+            if version is None:
+                continue
+            elegidos.append(version)
+            if ventana:
+                sorteos += len(extraer_sorteos_juego(version.historial, prefijos, None,
+                                                     tanda, desde, hasta))
+                if sorteos >= ventana:
+                    break
+        return tuple(elegidos)
+
+    def consultar(self, juego: str, estadistica: str = "analisis",
+                  ventana: int = SORTEOS_A_ANALIZAR, tanda: str = None,
+                  desde: str = None, hasta: str = None, numero: str = None):
+        if juego not in JUEGOS:
+            raise ValueError(f"Juego desconocido: {juego} (hay: {', '.join(JUEGOS)})")
+        if estadistica not in ESTADISTICAS:
+            raise ValueError(f"Estadística desconocida: {estadistica} "
+                             f"(hay: {', '.join(ESTADISTICAS)})")
+        if estadistica == "numero":
+            if not numero or not numero.strip().isdigit():
+                raise ValueError("La estadística 'numero' necesita el número a buscar")
+            # Como los guarda el historial: "7" es "07" (y "007" en Jugá 3)
+            numero = numero.strip().zfill(3 if juego == "juga3" else 2)
+        else:
+            numero = None
+        meses = self._vigentes(JUEGOS[juego][1], ventana, tanda, desde, hasta)
+        return self._consultar(meses, juego, estadistica, ventana, tanda, desde, hasta, numero)
+
+    def info_cache(self):
+        return self._consultar.cache_info()
+
+    def _calcular(self, meses, juego, estadistica, ventana, tanda, desde, hasta, numero):
+        nombre, prefijos = JUEGOS[juego]
+        historial = {}
+        for version in meses:
+            historial.update(version.historial)
+        sorteos = extraer_sorteos_juego(historial, prefijos, ventana, tanda, desde, hasta)
+
+        if estadistica == "analisis":
+            return analizar_juego(juego, nombre, sorteos)
+        if estadistica == "sorteos":
+            return sorteos
+        if estadistica == "frecuencias":
+            return {
+                "sorteos":    len(sorteos),
+                "total":      Counter(extraer_numeros(sorteos, juego)).most_common(),
+                "recientes":  Counter(extraer_numeros(sorteos[:7], juego)).most_common(),
+            }
+        # numero: en qué sorteos salió, del más reciente al más viejo
+        salidas = [{"fecha": s["fecha"], "key": s["key"]} for s in sorteos
+                   if numero in extraer_numeros([s], juego)]
+        return {"numero": numero, "sorteos": len(sorteos), "veces": len(salidas),
+                "salidas": salidas}
+
+
 def generar_analisis() -> dict | None:
     print("📂 Cargando historial...")
-    historial = cargar_historial()
+    historial = cargar_ultimos()
 
     if not historial:
         print("❌ Historial vacío, abortando.")
@@ -198,14 +383,16 @@ def generar_analisis() -> dict | None:
     return resultado
 
 
-def main():
+def main(perfil: Perfil = None):
+    perfil = perfil or Perfil("analizador")
     print("🧠 ANALIZADOR DE NÚMEROS — LOTO HONDURAS")
     print("=" * 60)
 
     fecha_hn = (datetime.now(timezone.utc) - timedelta(hours=6)).strftime("%Y-%m-%d")
     print(f"📅 Fecha Honduras: {fecha_hn}")
 
-    analisis = generar_analisis()
+    with perfil.fase("generar_analisis"):
+        analisis = generar_analisis()
 
     if not analisis:
         print("❌ No se pudo generar el análisis.")
@@ -228,4 +415,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # --profile: muestreo de pilas + pico de memoria por fase (ver perfilado.py)
+    perfil = Perfil("analizador", activo="--profile" in sys.argv).iniciar()
+    try:
+        main(perfil)
+    finally:
+        perfil.terminar()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Archivo de lo que la fuente mostró en cada corrida, antes de interpretarlo.
+
+historial.json guarda lo ya interpretado: si _formatear_numeros o la lectura
+de fechas tenían un error, lo guardado quedó mal y no hay de dónde sacar el
+dato original. Acá cada corrida agrega una línea con las tarjetas crudas (href,
+texto de la etiqueta, bolas, de dónde salió) y la hora en que se leyeron:
+
+    archivo_crudo/2026-10-19.jsonl.gz
+
+    {"ts": "...Z", "hora_hn": "...-06:00", "previos": {...}, "tarjetas": [...]}
+
+Un archivo por día de Honduras, comprimido y solo de agregar: cada corrida
+suma un miembro gzip completo al final. El archivo nuevo se escribe aparte y
+se renombra encima, así que una corrida que muere a mitad no deja un miembro
+cortado. Si igual aparece uno (un archivo de antes), leer() devuelve lo que se
+puede leer y avisa, y la próxima corrida reescribe el día sin la cola rota.
+Se reinterpreta con `python loto_scraper.py --reprocesar [--verificar]`.
+"""
+
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+
+DIRECTORIO = "archivo_crudo"
+EXTENSION = ".jsonl.gz"
+
+
+def archivar(tarjetas: list, previos: dict, hora_hn: datetime,
+             directorio: str = DIRECTORIO) -> str:
+    """Agrega la corrida al archivo de su día. Retorna la ruta."""
+    os.makedirs(directorio, exist_ok=True)
+    registro = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "hora_hn": hora_hn.isoformat(timespec="seconds"),
+        "previos": previos or {},
+        "tarjetas": tarjetas,
+    }
+    ruta = os.path.join(directorio, f"{hora_hn:%Y-%m-%d}{EXTENSION}")
+    try:
+        with open(ruta, "rb") as f:
+            existente = f.read()
+    except FileNotFoundError:
+        existente = b""
+    if existente:
+        registros, truncado = leer(ruta)
+        if truncado:
+            # Después de un miembro cortado nada se puede leer: se rehace sin él
+            print(f"   ⚠️  {ruta}: cola truncada, se reescribe con {len(registros)} corrida(s) legibles")
+            existente = gzip.compress("".join(_linea(r) for r in registros).encode("utf-8"))
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        f.write(existente + gzip.compress(_linea(registro).encode("utf-8")))
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def _linea(registro: dict) -> str:
+    return json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def archivos(directorio: str = DIRECTORIO) -> list:
+    if not os.path.isdir(directorio):
+        return []
+    return [os.path.join(directorio, n) for n in sorted(os.listdir(directorio))
+            if n.endswith(EXTENSION)]
+
+
+def leer(ruta: str) -> tuple:
+    """(corridas en el orden en que se agregaron, truncado). Si el archivo
+    termina en un miembro cortado, truncado es True y vienen las corridas
+    anteriores a la cola rota."""
+    registros = []
+    try:
+        with gzip.open(ruta, "rb") as f:
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    return registros, True
+                if linea.strip():
+                    registros.append(json.loads(linea))
+    except (EOFError, OSError, zlib.error, ValueError):
+        return registros, True
+    return registros, False
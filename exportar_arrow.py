@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Exporta historial.json a una tabla columnar Arrow (y Parquet, a pedido).
+
+En los notebooks se volvía a parsear el `{fecha: {clave: [str, ...]}}` anidado
+cada vez, y las listas de La Diaria (número, figura, multiplicador y "Más 1")
+lo hacían más incómodo. Acá queda una fila por valor sorteado:
+
+    fecha (date32) | familia | clave | tanda | posicion | valor (int16) | texto
+                   | figura | multiplicador
+
+En La Diaria cada valor se clasifica por lo que es, no por su lugar en la
+lista: lo que no es número es la figura, "JG" o "2X" es el multiplicador, y los
+números salen como filas en su orden (el número, posición 0, y el "Más 1",
+posición 1). Todas llevan la figura y el multiplicador del sorteo, o null si el
+sorteo no los trae (los del formato viejo son solo tres dígitos).
+
+Hay un archivo por mes en historial_arrow/ (formato IPC sin comprimir, que se
+abre con memory-map y se recorre sin parsear nada) y, con --parquet, su copia
+comprimida en historial_parquet/:
+
+    import pyarrow.dataset as ds
+    tabla = ds.dataset('historial_arrow', format='ipc').to_table(
+        filter=ds.field('familia') == 'pega_3')
+
+Es incremental: _estado.json guarda el hash de cada mes exportado y solo se
+reescriben los meses que cambiaron (en la práctica, el mes en curso).
+
+    python exportar_arrow.py [--parquet] [--todo]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from analizador import JUEGOS
+
+DIRECTORIO = "historial_arrow"
+# Aparte: un dataset de historial_arrow/ tomaría los .parquet como IPC
+DIRECTORIO_PARQUET = "historial_parquet"
+ESTADO = "_estado.json"
+
+RE_TANDA = re.compile(r"_(\d{1,2}(?:am|pm))$")
+RE_MULTIPLICADOR = re.compile(r"JG|\d+X", re.IGNORECASE)
+
+ESQUEMA = pa.schema([
+    ("fecha",         pa.date32()),
+    ("familia",       pa.dictionary(pa.int8(), pa.string())),
+    ("clave",         pa.dictionary(pa.int16(), pa.string())),
+    ("tanda",         pa.dictionary(pa.int8(), pa.string())),
+    ("posicion",      pa.int8()),
+    ("valor",         pa.int16()),
+    ("texto",         pa.string()),
+    ("figura",        pa.dictionary(pa.int16(), pa.string())),
+    ("multiplicador", pa.dictionary(pa.int8(), pa.string())),
+])
+
+
+def familia_de(clave: str) -> str:
+    for slug, (_, prefijos) in JUEGOS.items():
+        if clave.startswith(prefijos):
+            return slug
+    # Juegos que ya no publica la fuente pero siguen en el historial
+    return RE_TANDA.sub("", clave)
+
+
+def _entero(texto):
+    try:
+        return int(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+def filas_del_dia(fecha: str, sorteos: dict):
+    dia = date.fromisoformat(fecha)
+    for clave, nums in sorteos.items():
+        if not isinstance(nums, list):
+            continue
+        familia = familia_de(clave)
+        m = RE_TANDA.search(clave)
+        tanda = m.group(1) if m else None
+
+        if familia == "la_diaria":
+            numeros, figura, multiplicador = [], None, None
+            for texto in map(str, nums):
+                if RE_MULTIPLICADOR.fullmatch(texto):
+                    multiplicador = texto
+                elif _entero(texto) is None:
+                    figura = texto
+                else:
+                    numeros.append(texto)
+            for posicion, texto in enumerate(numeros):
+                yield (dia, familia, clave, tanda, posicion, _entero(texto), texto,
+                       figura, multiplicador)
+            continue
+
+        for posicion, texto in enumerate(nums):
+            yield (dia, familia, clave, tanda, posicion, _entero(texto), str(texto), None, None)
+
+
+def tabla_de(historial: dict, fechas) -> pa.Table:
+    columnas = list(zip(*(fila for f in fechas for fila in filas_del_dia(f, historial[f]))))
+    if not columnas:
+        return ESQUEMA.empty_table()
+    return pa.Table.from_arrays(
+        [pa.array(col, type=campo.type) for col, campo in zip(columnas, ESQUEMA)],
+        schema=ESQUEMA)
+
+
+def _hash_mes(historial: dict, fechas) -> str:
+    crudo = json.dumps({f: historial[f] for f in fechas}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(crudo.encode("utf-8")).hexdigest()
+
+
+def exportar(historial: dict, directorio: str = DIRECTORIO, parquet: bool = False,
+             todo: bool = False, directorio_parquet: str = DIRECTORIO_PARQUET) -> list:
+    """Reescribe los meses nuevos o cambiados. Retorna los meses escritos."""
+    os.makedirs(directorio, exist_ok=True)
+    if parquet:
+        os.makedirs(directorio_parquet, exist_ok=True)
+    ruta_estado = os.path.join(directorio, ESTADO)
+    estado = {}
+    if not todo and os.path.exists(ruta_estado):
+        with open(ruta_estado, "r", encoding="utf-8") as f:
+            estado = json.load(f)
+
+    meses = {}
+    for fecha in sorted(historial):
+        meses.setdefault(fecha[:7], []).append(fecha)
+
+    escritos = []
+    for mes, fechas in meses.items():
+        huella = _hash_mes(historial, fechas)
+        archivos = [os.path.join(directorio, f"{mes}.arrow")]
+        if parquet:
+            archivos.append(os.path.join(directorio_parquet, f"{mes}.parquet"))
+        if estado.get(mes) == huella and all(os.path.exists(a) for a in archivos):
+            continue
+
+        tabla = tabla_de(historial, fechas)
+        with pa.OSFile(archivos[0], "wb") as sink, ipc.new_file(sink, ESQUEMA) as writer:
+            writer.write_table(tabla)
+        if parquet:
+            import pyarrow.parquet as pq
+            pq.write_table(tabla, archivos[1], compression="zstd")
+        estado[mes] = huella
+        escritos.append(mes)
+
+    with open(ruta_estado, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2, sort_keys=True)
+    return escritos
+
+
+def leer(directorio: str = DIRECTORIO) -> pa.Table:
+    """Todo el historial como una tabla, leyendo los meses por memory-map."""
+    tablas = []
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith(".arrow"):
+            # Sin `with`: las columnas apuntan al mapa y tiene que seguir abierto
+            fuente = pa.memory_map(os.path.join(directorio, nombre), "r")
+            tablas.append(ipc.open_file(fuente).read_all())
+    return pa.concat_tables(tablas) if tablas else ESQUEMA.empty_table()
+
+
+def main():
+    from analizador import cargar_historial
+
+    print("🏹 EXPORTAR HISTORIAL A ARROW")
+    historial = cargar_historial()
+    if not historial:
+        print("❌ Historial vacío, nada que exportar.")
+        return False
+    escritos = exportar(historial, parquet="--parquet" in sys.argv, todo="--todo" in sys.argv)
+    if escritos:
+        print(f"💾 {DIRECTORIO}/: {len(escritos)} mes(es) reescrito(s): {', '.join(escritos)}")
+    else:
+        print(f"ℹ️  {DIRECTORIO}/ ya estaba al día")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
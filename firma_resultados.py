@@ -26,13 +26,21 @@ def firma(archivo='resultados_hoy.json'):
         # Sin archivo o ilegible: huella vacía, que nunca coincide con una real
         return ''
 
-    resumen = {
-        clave: {campo: sorteos[clave].get(campo) for campo in CAMPOS}
-        for clave in sorted(sorteos)
-    }
+    resumen = {clave: visible(sorteos[clave]) for clave in sorted(sorteos)}
     crudo = json.dumps(resumen, ensure_ascii=False, sort_keys=True)
     return hashlib.sha256(crudo.encode('utf-8')).hexdigest()
 
 
+def visible(sorteo):
+    """Solo los campos que ve el visitante de un sorteo."""
+    return {campo: sorteo.get(campo) for campo in CAMPOS}
+
+
+def firma_sorteo(sorteo):
+    """Huella de un solo juego: cambia solo si cambia lo que se ve de él."""
+    crudo = json.dumps(visible(sorteo), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(crudo.encode('utf-8')).hexdigest()
+
+
 if __name__ == '__main__':
     print(firma(sys.argv[1] if len(sys.argv) > 1 else 'resultados_hoy.json'))
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Generación masiva de boletos ponderados por la frecuencia de cada número.
+
+`_generar_sugerencias` del analizador da tres jugadas por juego. Acá se piden
+miles de boletos distintos de una vez:
+
+- Súper Premio: 6 números distintos del 01 al 33
+- Pega 3: 3 números distintos del 00 al 99
+- Premia 2: 2 números distintos del 00 al 99
+
+Cada número pesa según cuántas veces salió en los sorteos que mira el
+analizador (más un suavizado, para que ninguno quede en cero). El muestreo sin
+reemplazo es el de Efraimidis–Spirakis, vectorizado: a cada número de cada fila
+se le sortea una clave exponencial dividida por su peso y el boleto son las k
+claves más chicas. Los repetidos se sacan en bloque codificando cada boleto
+ordenado como un entero.
+
+Cada pedido trae su semilla y su propio `numpy.random.Generator`, así que el
+mismo pedido da siempre los mismos boletos y no se toca el estado global.
+
+    python generador_boletos.py super_premio 1000 --semilla 7
+    python generador_boletos.py --bench
+"""
+
+import sys
+import time
+from collections import Counter
+from itertools import chain, combinations
+from math import comb
+
+import numpy as np
+
+# juego -> (número más bajo, número más alto, números por boleto)
+UNIVERSOS = {
+    'super_premio': (1, 33, 6),
+    'pega_3':       (0, 99, 3),
+    'premia2':      (0, 99, 2),
+}
+
+SUAVIZADO = 1.0
+
+# Filas por bloque: acota la matriz de claves a unos pocos MB
+FILAS_POR_BLOQUE = 65536
+
+# Rondas de relleno cuando los repetidos dejan el pedido corto
+MAX_RONDAS = 64
+
+# Si el pedido es más que esta fracción de todas las combinaciones, los
+# repetidos dominan y conviene sortear directamente entre las combinaciones
+FRACCION_EXHAUSTIVA = 0.25
+
+
+def _universo(slug: str):
+    if slug not in UNIVERSOS:
+        raise ValueError(f"Juego sin generador de boletos: {slug} (hay: {', '.join(UNIVERSOS)})")
+    return UNIVERSOS[slug]
+
+
+def pesos_desde_frecuencias(slug: str, frecuencias: dict = None,
+                            suavizado: float = SUAVIZADO) -> np.ndarray:
+    """Vector de pesos sobre el universo del juego a partir de {'07': 3, ...}."""
+    minimo, maximo, _ = _universo(slug)
+    pesos = np.full(maximo - minimo + 1, suavizado, dtype=np.float64)
+    for numero, veces in (frecuencias or {}).items():
+        try:
+            valor = int(numero)
+        except ValueError:
+            continue
+        if minimo <= valor <= maximo:
+            pesos[valor - minimo] += veces
+    if not (pesos > 0).all():
+        raise ValueError("Todos los pesos tienen que ser positivos (usá suavizado > 0)")
+    return pesos
+
+
+def _muestrear(rng: np.random.Generator, pesos: np.ndarray, k: int, filas: int) -> np.ndarray:
+    """(filas, k) índices distintos por fila, ordenados, ponderados por `pesos`."""
+    claves = rng.standard_exponential((filas, len(pesos)), dtype=np.float32)
+    claves /= pesos.astype(np.float32)
+    indices = np.argpartition(claves, k - 1, axis=1)[:, :k]
+    indices.sort(axis=1)
+    return indices
+
+
+def _codificar(indices: np.ndarray, base: int) -> np.ndarray:
+    codigo = np.zeros(len(indices), dtype=np.int64)
+    for j in range(indices.shape[1]):
+        codigo = codigo * base + indices[:, j]
+    return codigo
+
+
+def _todas_las_combinaciones(base: int, k: int) -> np.ndarray:
+    planas = np.fromiter(chain.from_iterable(combinations(range(base), k)),
+                         dtype=np.int8, count=comb(base, k) * k)
+    return planas.reshape(-1, k)
+
+
+def _generar_exhaustivo(rng, pesos: np.ndarray, k: int, cantidad: int) -> np.ndarray:
+    """Mismo sorteo de claves, pero entre combinaciones enteras (peso = producto
+    de los pesos de sus números): nunca repite y no necesita rondas."""
+    combos = _todas_las_combinaciones(len(pesos), k)
+    log_peso = np.log(pesos)[combos].sum(axis=1)
+    claves = np.log(rng.standard_exponential(len(combos))) - log_peso
+    elegidas = np.argpartition(claves, cantidad - 1)[:cantidad]
+    elegidas = elegidas[np.argsort(claves[elegidas])]
+    return combos[elegidas].astype(np.int64)
+
+
+def generar_boletos(slug: str, cantidad: int, pesos: np.ndarray = None,
+                    semilla=None) -> np.ndarray:
+    """(cantidad, k) boletos distintos, cada uno con sus números en orden."""
+    minimo, maximo, k = _universo(slug)
+    base = maximo - minimo + 1
+    total = comb(base, k)
+    if cantidad > total:
+        raise ValueError(f"{slug} tiene solo {total} combinaciones distintas")
+    pesos = np.ones(base) if pesos is None else np.asarray(pesos, dtype=np.float64)
+    if pesos.shape != (base,):
+        raise ValueError(f"{slug} necesita {base} pesos, llegaron {pesos.shape}")
+
+    rng = np.random.default_rng(semilla)
+    if cantidad > total * FRACCION_EXHAUSTIVA:
+        return _generar_exhaustivo(rng, pesos, k, cantidad) + minimo
+
+    boletos = np.empty((0, k), dtype=np.int64)
+    for _ in range(MAX_RONDAS):
+        faltan = cantidad - len(boletos)
+        if faltan <= 0:
+            break
+        # Un poco de sobra por ronda para no depender de muchas vueltas
+        pedir = faltan + faltan // 8 + 16
+        bloques = [_muestrear(rng, pesos, k, min(FILAS_POR_BLOQUE, pedir - hecho))
+                   for hecho in range(0, pedir, FILAS_POR_BLOQUE)]
+        boletos = np.concatenate([boletos] + bloques)
+        # np.unique ordena por código: se vuelve al orden de generación para que
+        # el recorte no prefiera los boletos de números bajos
+        _, primeros = np.unique(_codificar(boletos, base), return_index=True)
+        boletos = boletos[np.sort(primeros)]
+    return boletos[:cantidad] + minimo
+
+
+def formatear(slug: str, boletos: np.ndarray) -> list:
+    """Boletos como los muestra el sitio: '04-10-14-20-22-28'."""
+    return ['-'.join(f"{n:02d}" for n in fila) for fila in boletos.tolist()]
+
+
+def boletos_para_juego(slug: str, cantidad: int, semilla=None, historial: dict = None) -> list:
+    """Boletos ponderados por las frecuencias que usa el analizador."""
+    import analizador
+
+    historial = analizador.cargar_ultimos() if historial is None else historial
+    prefijos = analizador.JUEGOS[slug][1]
+    sorteos = analizador.extraer_sorteos_juego(historial, prefijos)
+    frecuencias = Counter(analizador.extraer_numeros(sorteos, slug))
+    pesos = pesos_desde_frecuencias(slug, frecuencias)
+    return formatear(slug, generar_boletos(slug, cantidad, pesos, semilla))
+
+
+def benchmark(cantidad: int = 100_000):
+    print(f"⏱️  {cantidad} boletos por juego, pesos no uniformes")
+    rng = np.random.default_rng(0)
+    for slug, (minimo, maximo, k) in UNIVERSOS.items():
+        pesos = rng.integers(1, 10, maximo - minimo + 1).astype(np.float64)
+        inicio = time.perf_counter()
+        # Premia 2 no llega a 100k combinaciones distintas: se piden todas
+        boletos = generar_boletos(slug, min(cantidad, comb(maximo - minimo + 1, k)), pesos, semilla=1)
+        segundos = time.perf_counter() - inicio
+        print(f"   {slug:<13} {len(boletos):>8} en {segundos:.3f} s "
+              f"→ {len(boletos) / segundos:>12,.0f} boletos/s")
+
+
+if __name__ == '__main__':
+    if '--bench' in sys.argv:
+        benchmark()
+        sys.exit(0)
+    if len(sys.argv) < 3:
+        print("Uso: python generador_boletos.py <juego> <cantidad> [--semilla N] | --bench")
+        sys.exit(2)
+    semilla = None
+    if '--semilla' in sys.argv and sys.argv.index('--semilla') + 1 < len(sys.argv):
+        semilla = int(sys.argv[sys.argv.index('--semilla') + 1])
+    for boleto in boletos_para_juego(sys.argv[1], int(sys.argv[2]), semilla):
+        print(boleto)
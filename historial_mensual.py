@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Historial partido por mes: historial/2026-08.json, historial/2026-09.json...
+
+historial.json era una sola línea minificada que se reescribía entera en cada
+corrida, así que cada commit guardaba otra copia del archivo completo y git no
+podía aprovechar casi nada de la anterior. Con un archivo por mes, una corrida
+normal solo reescribe el mes en curso; los meses cerrados no vuelven a cambiar
+salvo una corrección.
+
+Cada partición tiene una fecha por línea (sigue siendo JSON válido). El
+analizador y servidor_consultas leen solo los meses que necesitan;
+historial.json se sigue generando completo únicamente porque el frontend lo
+baja tal cual. Solo se reescribe si cambió algo.
+
+Si historial/ todavía no existe, la primera lectura lo arma partiendo
+historial.json (migración automática).
+"""
+
+import json
+import os
+
+DIRECTORIO = "historial"
+COMPATIBLE = "historial.json"
+
+
+def _ruta(mes: str, directorio: str) -> str:
+    return os.path.join(directorio, f"{mes}.json")
+
+
+def _volcar(historial: dict, fechas, ruta: str):
+    lineas = [f"{json.dumps(f)}:{json.dumps(historial[f], ensure_ascii=False, separators=(',', ':'))}"
+              for f in sorted(fechas)]
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write("{\n" + ",\n".join(lineas) + "\n}\n")
+    os.replace(temporal, ruta)
+
+
+def meses(directorio: str = DIRECTORIO) -> list:
+    if not os.path.isdir(directorio):
+        return []
+    return sorted(n[:-5] for n in os.listdir(directorio)
+                  if n.endswith(".json") and len(n) == len("YYYY-MM.json"))
+
+
+def migrar(directorio: str = DIRECTORIO, compatible: str = COMPATIBLE) -> bool:
+    """Parte historial.json en meses si todavía no hay particiones."""
+    if meses(directorio) or not os.path.exists(compatible):
+        return False
+    with open(compatible, "r", encoding="utf-8") as f:
+        historial = json.load(f)
+    escribir_meses(historial, {f[:7] for f in historial}, directorio)
+    print(f"   🗂️  {compatible} partido en {len(meses(directorio))} mes(es) en {directorio}/")
+    return True
+
+
+def cargar_mes(mes: str, directorio: str = DIRECTORIO) -> dict:
+    try:
+        with open(_ruta(mes, directorio), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def cargar(desde: str = None, hasta: str = None, suficiente=None,
+           directorio: str = DIRECTORIO, compatible: str = COMPATIBLE) -> dict:
+    """Historial entre dos fechas YYYY-MM-DD leyendo solo los meses que tocan.
+
+    `suficiente(historial)` permite cortar antes: los meses se leen del más
+    nuevo al más viejo y se para en cuanto devuelve True."""
+    migrar(directorio, compatible)
+    historial = {}
+    for mes in reversed(meses(directorio)):
+        if (hasta and mes > hasta[:7]) or (desde and mes < desde[:7]):
+            continue
+        for fecha, sorteos in cargar_mes(mes, directorio).items():
+            if (hasta and fecha > hasta) or (desde and fecha < desde):
+                continue
+            historial[fecha] = sorteos
+        if suficiente and suficiente(historial):
+            break
+    return dict(sorted(historial.items()))
+
+
+def escribir_meses(historial: dict, tocados, directorio: str = DIRECTORIO) -> list:
+    """Reescribe solo los meses `tocados` (YYYY-MM) a partir de `historial`."""
+    os.makedirs(directorio, exist_ok=True)
+    escritos = []
+    for mes in sorted(tocados):
+        fechas = [f for f in historial if f.startswith(mes)]
+        if fechas:
+            _volcar(historial, fechas, _ruta(mes, directorio))
+        elif os.path.exists(_ruta(mes, directorio)):
+            os.remove(_ruta(mes, directorio))
+        escritos.append(mes)
+    return escritos
+
+
+def escribir_compatible(historial: dict, compatible: str = COMPATIBLE):
+    _volcar(historial, historial, compatible)
+
+
+def guardar(historial: dict, tocados, directorio: str = DIRECTORIO,
+            compatible: str = COMPATIBLE) -> list:
+    """Escribe los meses tocados y, si hubo alguno (o falta), historial.json."""
+    escritos = escribir_meses(historial, tocados, directorio)
+    if escritos or not os.path.exists(compatible):
+        escribir_compatible(historial, compatible)
+    return escritos
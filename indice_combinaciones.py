@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Índice de combinaciones de Súper Premio y Pega 3.
+
+"¿Ya salió esta combinación?" y "¿cuándo salieron juntos estos dos números?"
+obligaban a recorrer todo historial.json. Acá cada sorteo recibe un id y cada
+número guarda un bitmap (un int de Python) con los ids de los sorteos donde
+salió: los sorteos que contienen varios números son el AND de sus bitmaps.
+La combinación completa se busca en un diccionario por la tupla ordenada.
+
+El scraper lo actualiza al guardar el historial, sorteo por sorteo; si el
+archivo no existe se arma de cero desde historial/ (ver historial_mensual).
+
+El archivo va con un sorteo y un bitmap por línea: un sorteo nuevo agrega una
+línea y cambia solo los bitmaps de sus números, así el commit de cada corrida
+no vuelve a guardar el índice entero.
+"""
+
+import json
+import os
+
+import historial_mensual
+
+INDICE = "indice_combinaciones.json"
+
+# Igual que en analizador.JUEGOS: prefijos con los que aparece cada juego en el
+# historial, que conserva las claves de la fuente anterior
+FAMILIAS = {
+    'super_premio': ('super_premio',),
+    'pega_3':       ('pega_3', 'pega3'),
+}
+
+
+def familia_de(key: str):
+    for familia, prefijos in FAMILIAS.items():
+        if key.startswith(prefijos):
+            return familia
+    return None
+
+
+def normalizar(numeros) -> tuple:
+    """('4', '20', '04') -> ('04', '04', '20'): la combinación no depende del orden."""
+    return tuple(sorted(str(n).strip().zfill(2) for n in numeros))
+
+
+def _ids(bitmap: int):
+    while bitmap:
+        bajo = bitmap & -bitmap
+        yield bajo.bit_length() - 1
+        bitmap ^= bajo
+
+
+class IndiceFamilia:
+
+    def __init__(self):
+        self.sorteos = []      # id -> [fecha, key, combinacion]
+        self.por_sorteo = {}   # (fecha, key) -> id
+        self.bitmaps = {}      # número -> int con un bit por id de sorteo
+        self.combos = {}       # combinación -> [ids]
+
+    def agregar(self, fecha: str, key: str, numeros) -> bool:
+        """Retorna True si el índice cambió (sorteo nuevo o corregido)."""
+        combo = normalizar(numeros)
+        id_ = self.por_sorteo.get((fecha, key))
+        if id_ is None:
+            id_ = len(self.sorteos)
+            self.sorteos.append([fecha, key, combo])
+            self.por_sorteo[(fecha, key)] = id_
+        else:
+            anterior = self.sorteos[id_][2]
+            if anterior == combo:
+                return False
+            # Corrección de la fuente: se quitan los bits del resultado viejo
+            for n in set(anterior):
+                self.bitmaps[n] &= ~(1 << id_)
+            self.combos[anterior].remove(id_)
+            if not self.combos[anterior]:
+                del self.combos[anterior]
+            self.sorteos[id_][2] = combo
+
+        for n in set(combo):
+            self.bitmaps[n] = self.bitmaps.get(n, 0) | (1 << id_)
+        self.combos.setdefault(combo, []).append(id_)
+        return True
+
+    def exactos(self, numeros) -> list:
+        return self._fechados(self.combos.get(normalizar(numeros), []))
+
+    def contienen(self, numeros) -> list:
+        bitmap = -1
+        for n in set(normalizar(numeros)):
+            bitmap &= self.bitmaps.get(n, 0)
+            if not bitmap:
+                return []
+        if bitmap == -1:
+            return []  # sin números no hay consulta
+        return self._fechados(_ids(bitmap))
+
+    def _fechados(self, ids) -> list:
+        """(fecha, key, combinación) del más reciente al más viejo."""
+        encontrados = [tuple(self.sorteos[i][:2]) + (list(self.sorteos[i][2]),) for i in ids]
+        return sorted(encontrados, key=lambda s: (s[0], s[1]), reverse=True)
+
+    def a_dict(self) -> dict:
+        return {
+            'sorteos': [[f, k, '-'.join(c)] for f, k, c in self.sorteos],
+            'bitmaps': {n: format(b, 'x') for n, b in sorted(self.bitmaps.items())},
+        }
+
+    @classmethod
+    def desde_dict(cls, data: dict):
+        indice = cls()
+        for id_, (fecha, key, combo) in enumerate(data.get('sorteos', [])):
+            combo = tuple(combo.split('-')) if combo else ()
+            indice.sorteos.append([fecha, key, combo])
+            indice.por_sorteo[(fecha, key)] = id_
+            indice.combos.setdefault(combo, []).append(id_)
+        indice.bitmaps = {n: int(b, 16) for n, b in data.get('bitmaps', {}).items()}
+        return indice
+
+
+class IndiceCombinaciones:
+
+    def __init__(self, familias: dict = None):
+        self.familias = familias or {f: IndiceFamilia() for f in FAMILIAS}
+
+    def agregar(self, fecha: str, key: str, numeros) -> bool:
+        familia = familia_de(key)
+        if not familia or not numeros:
+            return False
+        return self.familias[familia].agregar(fecha, key, numeros)
+
+    def agregar_historial(self, historial: dict) -> int:
+        cambios = 0
+        for fecha in sorted(historial):
+            for key, nums in historial[fecha].items():
+                if isinstance(nums, list) and self.agregar(fecha, key, nums):
+                    cambios += 1
+        return cambios
+
+    def familia(self, juego: str) -> IndiceFamilia:
+        if juego not in self.familias:
+            raise ValueError(f"Juego sin índice de combinaciones: {juego} "
+                             f"(hay: {', '.join(self.familias)})")
+        return self.familias[juego]
+
+    # ----------------------------------------
+    # CONSULTAS
+    # ----------------------------------------
+
+    def ya_salio(self, juego: str, numeros) -> list:
+        """Sorteos con exactamente esa combinación, del más reciente al más viejo."""
+        return self.familia(juego).exactos(numeros)
+
+    def salieron_juntos(self, juego: str, numeros) -> list:
+        """Sorteos que traen todos esos números (y quizá otros)."""
+        return self.familia(juego).contienen(numeros)
+
+    def ultima_vez_juntos(self, juego: str, numeros):
+        sorteos = self.salieron_juntos(juego, numeros)
+        return sorteos[0] if sorteos else None
+
+    # ----------------------------------------
+    # PERSISTENCIA
+    # ----------------------------------------
+
+    def guardar(self, archivo: str = INDICE):
+        def linea(valor):
+            return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+
+        familias = []
+        for familia, indice in self.familias.items():
+            data = indice.a_dict()
+            sorteos = ",\n".join(linea(s) for s in data['sorteos'])
+            bitmaps = ",\n".join(f"{linea(n)}:{linea(b)}" for n, b in data['bitmaps'].items())
+            familias.append(f'{linea(familia)}:{{\n"sorteos":[\n{sorteos}\n],\n'
+                            f'"bitmaps":{{\n{bitmaps}\n}}}}')
+        temporal = archivo + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write("{\n" + ",\n".join(familias) + "\n}\n")
+        os.replace(temporal, archivo)
+
+    @classmethod
+    def cargar(cls, archivo: str = INDICE, historial: dict = None):
+        """Lee el índice guardado; sin archivo (o ilegible) lo arma desde el historial."""
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls({f: IndiceFamilia.desde_dict(data.get(f, {})) for f in FAMILIAS})
+        except (OSError, ValueError):
+            pass
+
+        indice = cls()
+        if historial is None:
+            historial = historial_mensual.cargar()
+        indice.agregar_historial(historial)
+        return indice
@@ -1,11 +1,20 @@
+import contextlib
+import io
 import json
 import re
 import sys
 import time
 import os
-import requests
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime, timedelta, timezone
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError, sync_playwright
+
+import archivo_crudo
+import historial_mensual
+from indice_combinaciones import INDICE, IndiceCombinaciones
+from notificaciones import EN_COLA, ENCOLADO, Notificador, VENTANA_ALERTA_S, VENTANA_RESUMEN_S
+from perfilado import Perfil
+from publicar import purgar_cache_cloudflare
 
 
 # ============================================
@@ -15,6 +24,9 @@ from playwright.sync_api import sync_playwright
 MAX_REINTENTOS     = 3
 ESPERA_REINTENTO   = 5
 
+# Plazos de navegación adaptativos (ver LatenciasNavegacion)
+LATENCIAS_ARCHIVO  = os.path.join("estado", "latencias_navegacion.json")
+
 TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID   = os.environ.get("TELEGRAM_CHAT_ID", "")
 
@@ -24,47 +36,94 @@ TELEGRAM_CHAT_ID   = os.environ.get("TELEGRAM_CHAT_ID", "")
 
 HN_TZ = timezone(timedelta(hours=-6))
 
+# Al reproducir una grabación el reloj se congela en la hora en que se grabó:
+# las fechas de las tarjetas se interpretan contra "hoy"
+HORA_FIJA = None
+
 def ahora_hn() -> datetime:
-    return datetime.now(HN_TZ)
+    return HORA_FIJA or datetime.now(HN_TZ)
 
 def fecha_hn_str(fmt='%Y-%m-%d') -> str:
     return ahora_hn().strftime(fmt)
 
 
+# ============================================
+# LATENCIAS DE NAVEGACIÓN
+# ============================================
+
+class LatenciasNavegacion:
+    """Duración de las últimas navegaciones hasta 'domcontentloaded', por tipo
+    ('portada', 'pagina'), guardadas entre corridas. De ahí salen los plazos:
+    la cobertura se lanza en el p95 y se abandona en varias veces ese p95, en
+    lugar de esperar siempre 60 s."""
+
+    MUESTRAS      = 50
+    MIN_MUESTRAS  = 5
+    # Sin suficiente historia: los plazos de antes (60 s) con cobertura a los 15 s
+    PLAZOS_INICIALES = (15.0, 60.0)
+    MIN_COBERTURA_S, MAX_COBERTURA_S = 3.0, 30.0
+    MIN_LIMITE_S, MAX_LIMITE_S = 15.0, 60.0
+    FACTOR_LIMITE = 4
+
+    def __init__(self, archivo: str = LATENCIAS_ARCHIVO):
+        self.archivo = archivo
+        try:
+            with open(archivo, "r", encoding="utf-8") as f:
+                self.muestras = json.load(f)
+        except (OSError, ValueError):
+            self.muestras = {}
+
+    def plazos(self, tipo: str):
+        """(segundos hasta lanzar la cobertura, segundos hasta darse por vencido)."""
+        muestras = sorted(self.muestras.get(tipo, []))
+        if len(muestras) < self.MIN_MUESTRAS:
+            return self.PLAZOS_INICIALES
+        p95 = muestras[min(len(muestras) - 1, int(0.95 * len(muestras)))]
+        cobertura = min(max(p95, self.MIN_COBERTURA_S), self.MAX_COBERTURA_S)
+        limite = min(max(p95 * self.FACTOR_LIMITE, self.MIN_LIMITE_S), self.MAX_LIMITE_S)
+        return cobertura, max(limite, cobertura)
+
+    def anotar(self, tipo: str, segundos: float):
+        lista = self.muestras.setdefault(tipo, [])
+        lista.append(round(segundos, 3))
+        del lista[:-self.MUESTRAS]
+        try:
+            os.makedirs(os.path.dirname(self.archivo) or ".", exist_ok=True)
+            with open(self.archivo, "w", encoding="utf-8") as f:
+                json.dump(self.muestras, f)
+        except OSError as e:
+            print(f"⚠️  No se pudieron guardar las latencias: {e}")
+
+
+LATENCIAS = LatenciasNavegacion()
+
+
 # ============================================
 # FUNCIONES TELEGRAM
 # ============================================
 
-def enviar_telegram(mensaje: str, silencioso: bool = False) -> bool:
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        print("⚠️  Telegram no configurado (faltan variables de entorno)")
-        return False
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": mensaje,
-        "parse_mode": "HTML",
-        "disable_notification": silencioso
-    }
-    try:
-        resp = requests.post(url, json=payload, timeout=10)
-        if not resp.ok:
-            print(f"⚠️  Telegram HTTP {resp.status_code}: {resp.text}")
-            return False
-        return True
-    except Exception as e:
-        print(f"⚠️  Error enviando a Telegram: {e}")
-        return False
+# La bandeja deduplica por clave (el mensaje sin la hora). El scraper solo
+# encola: lo manda publicar.py, junto con el resto de lo que sale hacia afuera.
+# Ver notificaciones.py
+NOTIFICADOR = Notificador(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+
+
+def enviar_telegram(mensaje: str, silencioso: bool = False, clave: str = None,
+                    ventana: int = VENTANA_ALERTA_S) -> bool:
+    """Encola el mensaje para publicar.py. Retorna False si no hay Telegram o ya
+    se mandó uno igual."""
+    return NOTIFICADOR.encolar(mensaje, clave, silencioso, ventana) in (ENCOLADO, EN_COLA)
 
 
-def alerta_error_scraping(motivo: str):
+def alerta_error_scraping(motivo: str, clave: str = None):
     msg = (
         "🚨 <b>SCRAPER — ERROR</b>\n"
         f"❌ Motivo: {motivo}\n"
         f"🕐 {fecha_hn_str('%Y-%m-%d %H:%M:%S')} HN"
     )
-    print("   📨 Enviando alerta de error a Telegram...")
-    enviar_telegram(msg)
+    print("   📨 Alerta de error encolada para Telegram")
+    # Sin la hora en la clave: la misma falla no se repite en cada corrida
+    enviar_telegram(msg, clave=f"alerta:{clave or motivo}")
 
 
 def resumen_telegram(resultados: dict):
@@ -88,33 +147,12 @@ def resumen_telegram(resultados: dict):
     if bloque_previos:
         lineas += ["", f"🕓 <b>SORTEOS ANTERIORES ({len(bloque_previos)})</b>"] + bloque_previos
 
-    print("📨 Enviando resumen a Telegram...")
-    enviar_telegram("\n".join(lineas), silencioso=True)
-
-
-# ============================================
-# PURGAR CACHÉ CLOUDFLARE
-# ============================================
-
-def purgar_cache_cloudflare():
-    CF_ZONE_ID = os.environ.get("CF_ZONE_ID", "")
-    CF_TOKEN   = os.environ.get("CF_TOKEN", "")
-    if not CF_ZONE_ID or not CF_TOKEN:
-        print("⚠️  Cloudflare no configurado (faltan CF_ZONE_ID o CF_TOKEN)")
-        return
-    try:
-        resp = requests.post(
-            f"https://api.cloudflare.com/client/v4/zones/{CF_ZONE_ID}/purge_cache",
-            headers={"Authorization": f"Bearer {CF_TOKEN}", "Content-Type": "application/json"},
-            json={"purge_everything": True},
-            timeout=10
-        )
-        if resp.ok:
-            print("✅ Caché de Cloudflare purgado correctamente")
-        else:
-            print(f"⚠️  Error purgando caché: {resp.text}")
-    except Exception as e:
-        print(f"⚠️  Error al purgar caché: {e}")
+    print("📨 Resumen encolado para Telegram")
+    # La clave deja fuera la línea de la hora: si los números no cambiaron, el
+    # resumen es el mismo y no se vuelve a mandar
+    clave = "resumen:" + "\n".join(bloque_hoy + bloque_previos)
+    enviar_telegram("\n".join(lineas), silencioso=True, clave=clave,
+                    ventana=VENTANA_RESUMEN_S)
 
 
 # ============================================
@@ -186,6 +224,35 @@ SELECTOR_ESPERA = ', '.join(f'{SELECTOR_TARJETA} {s.strip()}'
                             for s in SELECTOR_BOLAS.split(','))
 
 
+# Foto estructural de la portada, para abortar en un par de segundos cuando la
+# fuente cambia el diseño en vez de agotar los 30 s de espera. Se guarda la de
+# la última corrida que sí leyó tarjetas, junto al resto del estado del runner,
+# y cada corrida se compara contra ella.
+ESTRUCTURA_CONOCIDA = os.path.join('estado', 'estructura_portada.json')
+SONDA_DESDE_S  = 1.0   # antes de esto ni se mira: la grilla recién arranca
+SONDA_QUIETA_S = 1.5   # cuánto tiene que estar quieta la página para juzgarla
+
+JS_SONDA = """(sel) => {
+    const enlaces = [...document.querySelectorAll('a[href*="/loto-hn/"]')];
+    const slugs = new Set(), clases = new Set();
+    for (const a of enlaces) {
+        const partes = a.getAttribute('href').split('/').filter(Boolean);
+        slugs.add(partes[partes.length - 1]);
+        for (const el of a.querySelectorAll('[class]'))
+            for (const c of el.classList)
+                if (/score|ball|bola|num|result/i.test(c)) clases.add(c);
+    }
+    return {
+        listo: document.readyState,
+        enlaces: enlaces.length,
+        slugs: [...slugs].sort(),
+        bolas: enlaces.reduce((n, a) => n + a.querySelectorAll(sel.bolas).length, 0),
+        etiquetas: document.querySelectorAll('.bg-slate-500').length,
+        clases: [...clases].sort().slice(0, 20),
+    };
+}"""
+
+
 def ultimo_sorteo_esperado(juego_key: str, hora: str, ahora: datetime = None,
                            margen: int = MARGEN_PUBLICACION_MIN) -> date:
     """Fecha del sorteo más reciente de este juego que ya debería estar publicado."""
@@ -250,6 +317,175 @@ def sorteos_atrasados(guardados: dict) -> list:
     return problemas
 
 
+# ============================================
+# DATOS DE LA FUENTE EN VEZ DEL DOM
+# ============================================
+#
+# La grilla se pinta en el navegador, así que los sorteos llegan antes como JSON
+# (XHR/fetch) o incrustados en la página para hidratarla. Leerlos ahí evita
+# esperar a que se pinten las bolas y las tarjetas a medio pintar. Como no hay
+# un contrato con la fuente, se busca por forma: cualquier objeto que tenga el
+# slug de un juego (/loto-hn/<slug>/ o el slug suelto), una fecha y una lista
+# de bolas. Las bolas además tienen que tener la forma exacta de las de ese
+# juego (ver forma_valida): un objeto cualquiera con el slug, una fecha y una
+# lista de palabras no es un sorteo. Si nada coincide, la corrida sigue por el
+# DOM como siempre.
+
+RE_SLUG_DATO = re.compile(r'/loto-hn/([a-z0-9-]+)')
+RE_FECHA_DATO = re.compile(r'(?P<anio>\d{4})-(?P<mes>\d{2})-(?P<dia>\d{2})'
+                           r'(?:[T ](?P<hora>\d{2}):(?P<minuto>\d{2})(?::\d{2}(?:\.\d+)?)?'
+                           r'(?P<zona>Z|[+-]\d{2}:?\d{2})?)?')
+# Campos cuyo nombre delata la fecha del sorteo, si el objeto trae varias
+PISTAS_FECHA = ('fecha', 'date', 'draw', 'sorteo')
+# Nombres del valor cuando cada bola viene como objeto ({"numero": "07"})
+CAMPOS_BOLA = ('numero', 'number', 'valor', 'value', 'ball', 'bola', 'resultado')
+
+# Formas de las bolas por juego, tal como las pinta la portada
+RE_BOLA_2 = re.compile(r'\d{2}')
+RE_BOLA_JUGA3 = re.compile(r'\d{3}')
+RE_DIARIA_NUMERO = re.compile(r'\d{2} [^\d\s][^\d]*')  # "87 León"
+RE_MULTIPLICADOR = re.compile(r'JG|\d+X', re.IGNORECASE)
+RE_ADICIONAL = re.compile(r'\d{1,2}')
+
+
+def forma_valida(juego_key: str, bolas: list) -> bool:
+    """True si `bolas` (ya como texto) tiene la forma completa del juego."""
+    if not all(isinstance(b, str) for b in bolas):
+        return False
+    if juego_key.startswith('juga3'):
+        return len(bolas) == 1 and bool(RE_BOLA_JUGA3.fullmatch(bolas[0]))
+    if juego_key.startswith('diaria'):
+        # número con figura, multiplicador y "Más 1"
+        return (len(bolas) == 3 and bool(RE_DIARIA_NUMERO.fullmatch(bolas[0]))
+                and bool(RE_MULTIPLICADOR.fullmatch(bolas[1]))
+                and bool(RE_ADICIONAL.fullmatch(bolas[2])))
+    if len(bolas) != valores_esperados(juego_key) or not all(RE_BOLA_2.fullmatch(b) for b in bolas):
+        return False
+    if juego_key.startswith('super_premio'):
+        return len(set(bolas)) == len(bolas) and all(1 <= int(b) <= 33 for b in bolas)
+    return True
+
+
+# Blobs de hidratación habituales: Next.js, Nuxt y JSON incrustado. Sin
+# ld+json: es metadata de SEO (url, dateModified, keywords) con la forma justa
+# para pasar por un sorteo y nunca trae las bolas.
+JS_HIDRATACION = """() => {
+    const blobs = [];
+    for (const s of document.querySelectorAll(
+            'script#__NEXT_DATA__, script[type="application/json"]'))
+        blobs.push(s.textContent);
+    for (const k of ['__NUXT__', '__INITIAL_STATE__', '__APOLLO_STATE__'])
+        try { if (window[k]) blobs.push(JSON.stringify(window[k])); } catch (e) {}
+    return blobs;
+}"""
+
+
+def _bolas_de_dato(valor: list):
+    bolas = []
+    for b in valor:
+        if isinstance(b, dict):
+            b = next((b[c] for c in CAMPOS_BOLA if isinstance(b.get(c), (str, int))), None)
+        if isinstance(b, bool) or not isinstance(b, (str, int)):
+            return None
+        if isinstance(b, str):
+            b = re.sub(r'\s+', ' ', b).strip()
+            if not b or b in ('-', '?'):
+                continue
+        bolas.append(b)
+    return bolas if 0 < len(bolas) <= 8 else None
+
+
+def filas_de_datos(datos) -> list:
+    """Recorre un JSON cualquiera y saca las filas {href, etiqueta, bolas} que
+    parecen sorteos de un juego vigente."""
+    filas = []
+    pila = [datos]
+    while pila:
+        nodo = pila.pop()
+        if isinstance(nodo, list):
+            pila.extend(nodo)
+            continue
+        if not isinstance(nodo, dict):
+            continue
+        slug, fechas, bolas = None, [], None
+        for campo, valor in nodo.items():
+            if isinstance(valor, str):
+                m = RE_SLUG_DATO.search(valor)
+                if m and m.group(1) in JUEGOS:
+                    slug = m.group(1)
+                elif valor in JUEGOS:
+                    slug = valor
+                elif RE_FECHA_DATO.search(valor) or re.fullmatch(r'\d{2}-\d{2}', valor):
+                    if any(p in str(campo).lower() for p in PISTAS_FECHA):
+                        fechas.insert(0, valor)
+                    else:
+                        fechas.append(valor)
+            elif isinstance(valor, list):
+                bolas = bolas or _bolas_de_dato(valor)
+                pila.append(valor)
+            elif isinstance(valor, dict):
+                pila.append(valor)
+        if slug and fechas and bolas:
+            filas.append({'href': f'/loto-hn/{slug}/', 'etiqueta': fechas[0],
+                          'bolas': bolas, 'origen': 'datos_fuente'})
+    return filas
+
+
+class CapturaDatos:
+    """Junta las respuestas JSON que pide la portada y los blobs de hidratación."""
+
+    def __init__(self, context):
+        self.respuestas = []
+        self.filas = []
+        self.resultados = {}
+        self.descartes = []
+        self._leidas = 0
+        self._hidratacion = False
+        context.on('response', self._al_responder)
+
+    def _al_responder(self, respuesta):
+        # Solo se anota: leer el cuerpo dentro del evento bloquearía el despacho
+        if (respuesta.request.resource_type in ('xhr', 'fetch')
+                and 'json' in (respuesta.headers.get('content-type') or '')):
+            self.respuestas.append(respuesta)
+
+    def actualizar(self, page, scraper):
+        nuevas = self.respuestas[self._leidas:]
+        self._leidas = len(self.respuestas)
+        for respuesta in nuevas:
+            try:
+                self.filas += filas_de_datos(respuesta.json())
+            except Exception:
+                continue  # cuerpo ya descartado por el navegador o no era JSON
+
+        if not self._hidratacion:
+            self._hidratacion = True
+            try:
+                blobs = page.evaluate(JS_HIDRATACION)
+            except Exception:
+                blobs = []
+            for blob in blobs:
+                try:
+                    self.filas += filas_de_datos(json.loads(blob))
+                except ValueError:
+                    continue
+            nuevas = nuevas or blobs
+
+        if nuevas and self.filas:
+            self.resultados, self.descartes = scraper._resultados_desde_filas(self.filas)
+
+    def completo(self) -> bool:
+        """Todos los juegos, con todas sus bolas y del sorteo que ya tocaba: un
+        blob de hidratación cacheado puede traer todavía los de ayer."""
+        if not KEYS_VIGENTES <= set(self.resultados):
+            return False
+        if any(esta_incompleto(r, k) for k, r in self.resultados.items()):
+            return False
+        return all(self.resultados[j['key']]['fecha_historial']
+                   >= ultimo_sorteo_esperado(j['key'], j['hora']).strftime('%Y-%m-%d')
+                   for j in JUEGOS.values())
+
+
 class LotoHondurasScraper:
 
     BASE_URL = "https://loteriasdehonduras.com/"
@@ -257,6 +493,16 @@ class LotoHondurasScraper:
     USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
                   '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
 
+    def __init__(self, har: str = None, grabar: bool = False):
+        # Con `har` la corrida se graba (grabar=True) o se sirve desde ese HAR
+        # sin tocar la red. Ver "GRABAR Y REPRODUCIR LA FUENTE" más abajo.
+        self.har = har
+        self.grabar = grabar
+        # Motivo preciso cuando la corrida se aborta por un cambio de la portada
+        self.diagnostico = None
+        # Lo que se leyó de la fuente tal cual, antes de interpretarlo
+        self.crudos = []
+
     # ----------------------------------------
     # ENTRADA PRINCIPAL
     # ----------------------------------------
@@ -265,6 +511,7 @@ class LotoHondurasScraper:
         resultados = {}
         descartes = []
         previos = previos or {}
+        self.crudos = []
 
         print(f"🌐 Cargando {self.BASE_URL} ...")
         print("=" * 60)
@@ -273,48 +520,72 @@ class LotoHondurasScraper:
             with sync_playwright() as p:
                 browser = p.chromium.launch(headless=True)
                 context = browser.new_context(user_agent=self.USER_AGENT)
+                self._preparar_har(context)
+                captura = CapturaDatos(context)
                 page = context.new_page()
 
-                self._navegar_con_reintentos(page)
-
-                try:
-                    page.wait_for_selector(SELECTOR_ESPERA, timeout=30000)
-                except Exception as e:
-                    print(f"⚠️  Timeout esperando los resultados: {e}")
-                    browser.close()
+                page = self._navegar_con_reintentos(page)
+
+                # Si los datos de la fuente ya traen todos los sorteos completos
+                # no hace falta esperar a que se pinte nada
+                if not self._esperar_datos_o_tarjetas(page, captura):
+                    if self.diagnostico:
+                        # Sin las páginas de respaldo: usan los mismos selectores
+                        print(f"🧱 La portada cambió de estructura: {self.diagnostico}")
+                    else:
+                        print("⚠️  Timeout esperando los resultados")
+                    self._cerrar(browser, context)
                     return resultados
 
+                resultados.update(captura.resultados)
+                if captura.completo():
+                    print(f"⚡ Los {len(resultados)} sorteos salieron de los datos de la "
+                          f"fuente: no se lee el DOM")
+                    self.crudos += captura.filas
+                    self._cerrar(browser, context)
+                    return self._cerrar_corrida(resultados, captura.descartes)
+                descartes += captura.descartes
+
                 self._esperar_tarjetas_estables(page)
 
                 tarjetas = page.query_selector_all(SELECTOR_TARJETA)
                 print(f"🃏 Enlaces de sorteo encontrados: {len(tarjetas)}")
 
-                for tarjeta in tarjetas:
-                    resultado, motivo = self._procesar_tarjeta(tarjeta, previos)
-                    if motivo:
-                        descartes.append(motivo)
-                    if not resultado:
-                        continue
-                    key = resultado['juego']
-                    # La fuente muestra el mismo juego varias veces (feed "En Directo"
-                    # + grilla de resultados). Nos quedamos con el sorteo más nuevo,
-                    # no con el que venga primero en el DOM.
-                    if key in resultados and not self._es_mas_reciente(resultado, resultados[key]):
-                        continue
-                    resultados[key] = resultado
-                    print(f"   ✅ {resultado['nombre_juego']}: {resultado['numero_ganador']} "
-                          f"| {resultado['fecha_historial']} | {resultado['origen']} "
-                          f"| todos: {resultado['numeros_adicionales']}")
+                # Primero se lee todo lo crudo y después se interpreta: lo crudo
+                # queda archivado y se puede volver a interpretar sin la fuente
+                crudos = [c for c in map(self._leer_tarjeta, tarjetas) if c]
+                self.crudos += crudos
+                descartes += self._fusionar_tarjetas(resultados, crudos, previos)
+
+                if any(r['origen'] in ('etiqueta', 'en_directo') for r in resultados.values()):
+                    self._guardar_estructura(self._sondear_estructura(page))
+
+                # Lo que llegó por la red mientras se pintaba la grilla
+                captura.actualizar(page, self)
+                self.crudos += captura.filas
+                for key, resultado in captura.resultados.items():
+                    if key not in resultados or self._es_mas_reciente(resultado, resultados[key]):
+                        resultados[key] = resultado
 
                 # Ojo: esto navega fuera de la portada, así que va después de
                 # recorrer las tarjetas (sus handles quedan inválidos al salir)
                 descartes += self._completar_desde_paginas(page, resultados)
 
-                browser.close()
+                self._cerrar(browser, context)
 
         except Exception as e:
             print(f"❌ Error iniciando Playwright/browser: {e}")
 
+        return self._cerrar_corrida(resultados, descartes)
+
+    @staticmethod
+    def _informar(resultado: dict):
+        print(f"   ✅ {resultado['nombre_juego']}: {resultado['numero_ganador']} "
+              f"| {resultado['fecha_historial']} | {resultado['origen']} "
+              f"| todos: {resultado['numeros_adicionales']}")
+
+    @staticmethod
+    def _cerrar_corrida(resultados: dict, descartes: list) -> dict:
         if descartes:
             # Sin esto, una tarjeta rechazada desaparece en silencio y el juego se
             # queda con el resultado de ayer sin que nada lo indique
@@ -330,6 +601,175 @@ class LotoHondurasScraper:
             print(f"⚠️  Sin resultado en la fuente: {', '.join(sorted(faltantes))}")
         return resultados
 
+    # ----------------------------------------
+    # DATOS DE LA FUENTE (XHR / HIDRATACIÓN)
+    # ----------------------------------------
+
+    def _esperar_datos_o_tarjetas(self, page, captura, timeout: float = 30.0) -> bool:
+        """Reemplaza al wait_for_selector de la grilla: sale apenas los datos
+        capturados cubren todos los juegos, o apenas aparece la primera bola."""
+        inicio = time.monotonic()
+        conocida = self._cargar_estructura()
+        sondas = []
+        while True:
+            captura.actualizar(page, self)
+            if captura.completo() or page.query_selector(SELECTOR_ESPERA):
+                return True
+            if time.monotonic() - inicio > timeout:
+                return bool(captura.resultados)
+
+            # Mientras tanto, si la página ya se quedó quieta y no se parece a la
+            # que conocemos, no tiene sentido agotar los 30 s
+            if time.monotonic() - inicio >= SONDA_DESDE_S:
+                sondas.append((time.monotonic(), self._sondear_estructura(page)))
+                self.diagnostico = self._deriva_de_estructura(sondas, conocida)
+                if self.diagnostico and not captura.resultados:
+                    return False
+                self.diagnostico = None
+            page.wait_for_timeout(250)
+
+    # ----------------------------------------
+    # DETECTAR UN CAMBIO DE DISEÑO DE LA PORTADA
+    # ----------------------------------------
+
+    def _sondear_estructura(self, page) -> dict:
+        try:
+            return page.evaluate(JS_SONDA, {'bolas': SELECTOR_BOLAS})
+        except Exception:
+            return {}  # la página todavía está navegando
+
+    @staticmethod
+    def _deriva_de_estructura(sondas: list, conocida: dict):
+        """Motivo del cambio si la portada ya terminó de pintarse y su estructura
+        no es la de la última corrida buena; None si coincide, si todavía puede
+        cambiar o si no hay con qué comparar.
+
+        Que las tarjetas sigan sin bolas no alcanza: mientras el XHR de los
+        resultados no vuelve, la portada muestra las tarjetas vacías y quietas.
+        Solo se aborta si lo que conocíamos ya no está."""
+        if not conocida.get('slugs') and not conocida.get('clases'):
+            return None  # primera corrida (o se perdió el estado): se espera entera
+        ultima_t, ultima = sondas[-1]
+        if not ultima or ultima.get('listo') != 'complete':
+            return None
+        # Quieta = la misma foto desde hace SONDA_QUIETA_S: si sigue creciendo,
+        # es que todavía se está pintando
+        quieta = [t for t, sonda in sondas if sonda == ultima]
+        if ultima_t - quieta[0] < SONDA_QUIETA_S:
+            return None
+
+        slugs_conocidos = set(conocida.get('slugs') or [])
+        if slugs_conocidos and not slugs_conocidos & set(ultima['slugs']):
+            if not ultima['enlaces']:
+                return (f"no hay ningún enlace /loto-hn/ en la portada "
+                        f"(se conocían {len(slugs_conocidos)} juegos)")
+            return (f"los enlaces /loto-hn/ ya no usan ningún slug conocido: "
+                    f"{', '.join(ultima['slugs'][:8])}")
+
+        # Clases candidatas nuevas en lugar de las conocidas = otro diseño. Sin
+        # ninguna clase candidata, las tarjetas todavía no se llenaron
+        clases_conocidas = set(conocida.get('clases') or [])
+        if clases_conocidas and ultima['clases'] and not clases_conocidas & set(ultima['clases']):
+            return (f"{ultima['enlaces']} tarjetas sin las clases de bola conocidas "
+                    f"({', '.join(sorted(clases_conocidas))}): ahora {', '.join(ultima['clases'])}")
+        return None
+
+    @staticmethod
+    def _cargar_estructura(archivo=ESTRUCTURA_CONOCIDA) -> dict:
+        try:
+            with open(archivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _guardar_estructura(sonda: dict, archivo=ESTRUCTURA_CONOCIDA):
+        if not sonda or not sonda.get('bolas'):
+            return
+        try:
+            os.makedirs(os.path.dirname(archivo) or '.', exist_ok=True)
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump({'clases': sonda['clases'], 'slugs': sonda['slugs'],
+                           'enlaces': sonda['enlaces'], 'etiquetas': sonda['etiquetas']},
+                          f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar {archivo}: {e}")
+
+    def _resultados_desde_filas(self, filas: list):
+        """Filas {href, etiqueta, bolas} de los datos de la fuente -> (resultados,
+        descartes). Igual que en la página de cada juego, manda la fila más nueva."""
+        mejores = {}
+        for fila in filas:
+            slug = fila['href'].strip('/').split('/')[-1]
+            juego = JUEGOS.get(slug)
+            fecha = juego and self._fecha_de_dato(fila['etiqueta'], juego['hora'])
+            if not fecha or not fila['bolas']:
+                continue
+            bolas = [str(b).zfill(3 if juego['key'].startswith('juga3') else 2)
+                     if isinstance(b, int) else b for b in fila['bolas']]
+            if not forma_valida(juego['key'], bolas):
+                continue  # el objeto nombra el juego, pero eso no son sus bolas
+            if slug not in mejores or fecha > mejores[slug][0]:
+                mejores[slug] = (fecha, bolas)
+
+        resultados, descartes = {}, []
+        for slug, (fecha_sorteo, bolas) in mejores.items():
+            juego = JUEGOS[slug]
+            ganador, adicionales, individuales, extras = self._formatear_numeros(bolas, juego['key'])
+            if not ganador:
+                descartes.append(f"{slug}: no se pudo interpretar {bolas} de los datos de la fuente")
+                continue
+            resultados[juego['key']] = self._armar_resultado(
+                juego, fecha_sorteo, ganador, adicionales, individuales, extras, 'datos_fuente')
+        return resultados, descartes
+
+    def _fecha_de_dato(self, texto: str, hora: str):
+        """Fecha del sorteo a partir del campo de fecha de los datos de la fuente.
+
+        Con hora y zona ("2026-08-22T03:00:00Z") es un instante: pasado a hora HN
+        ya es el día del sorteo. Sin hora ("2026-08-22" o "22-08") es el día UTC
+        que muestran las tarjetas y lleva el mismo desfase."""
+        m = RE_FECHA_DATO.search(texto or '')
+        if not m:
+            fecha = self._fecha_desde_texto(texto)
+            return fecha and fecha - timedelta(days=DESFASE_UTC_DIAS[hora])
+        try:
+            fecha = date(int(m['anio']), int(m['mes']), int(m['dia']))
+        except ValueError:
+            return None
+        if m['hora'] and m['zona']:
+            zona = timezone.utc
+            if m['zona'] != 'Z':
+                signo = -1 if m['zona'][0] == '-' else 1
+                hh, mm = int(m['zona'][1:3]), int(m['zona'][-2:])
+                zona = timezone(signo * timedelta(hours=hh, minutes=mm))
+            instante = datetime(fecha.year, fecha.month, fecha.day,
+                                int(m['hora']), int(m['minuto']), tzinfo=zona)
+            fecha = instante.astimezone(HN_TZ).date()
+        else:
+            fecha -= timedelta(days=DESFASE_UTC_DIAS[hora])
+        if abs((fecha - ahora_hn().date()).days) > MAX_DIAS_FECHA:
+            return None
+        return fecha
+
+    def _preparar_har(self, context):
+        if not self.har:
+            return
+        if self.grabar:
+            # 'embed' deja todo en un solo archivo: portada, páginas y sus scripts
+            context.route_from_har(self.har, update=True, update_content='embed')
+            print(f"⏺️  Grabando la fuente en {self.har}")
+        else:
+            # Lo que no está grabado (publicidad, analítica) se corta: nada sale a la red
+            context.route_from_har(self.har, not_found='abort')
+            print(f"⏯️  Reproduciendo la fuente desde {self.har}")
+
+    def _cerrar(self, browser, context):
+        # El HAR se escribe al cerrar el contexto, no el navegador
+        if self.har and self.grabar:
+            context.close()
+        browser.close()
+
     @staticmethod
     def _es_mas_reciente(nuevo: dict, actual: dict) -> bool:
         if nuevo['fecha_historial'] != actual['fecha_historial']:
@@ -358,12 +798,12 @@ class LotoHondurasScraper:
     # ----------------------------------------
 
     def _navegar_con_reintentos(self, page):
+        """Retorna la página que quedó en la portada: puede ser otra si ganó la
+        navegación de cobertura."""
         ultimo_error = None
         for intento in range(MAX_REINTENTOS):
             try:
-                # 'networkidle' no sirve: la publicidad del sitio mantiene la red ocupada
-                page.goto(self.BASE_URL, wait_until='domcontentloaded', timeout=60000)
-                return
+                return self._navegar_cubierto(page, self.BASE_URL, 'portada')
             except Exception as e:
                 ultimo_error = e
                 if intento < MAX_REINTENTOS - 1:
@@ -371,31 +811,125 @@ class LotoHondurasScraper:
                     time.sleep(ESPERA_REINTENTO)
         raise ultimo_error
 
+    def _navegar_cubierto(self, page, url: str, tipo: str):
+        """goto con timeout adaptativo y cobertura: si la navegación no llegó a
+        'domcontentloaded' para el p95 de las recientes, se lanza otra igual en
+        una página nueva y se queda la que termine primero. Una conexión TCP
+        trabada ya no se come el timeout entero."""
+        cobertura_s, limite_s = LATENCIAS.plazos(tipo)
+        listas = {}
+
+        def vigilar(p, nombre):
+            # Cualquier domcontentloaded del marco principal después de lanzar
+            # la navegación es la nuestra: comparar con `url` perdía las que
+            # terminan en una redirección (www, barra final)
+            def al_cargar(*_):
+                if p.url != 'about:blank' and nombre not in listas:
+                    listas[nombre] = time.monotonic()
+            p.on('domcontentloaded', al_cargar)
+            return al_cargar
+
+        inicio = time.monotonic()
+        oyente = vigilar(page, 'principal')
+        try:
+            # 'networkidle' no sirve: la publicidad del sitio mantiene la red ocupada
+            page.goto(url, wait_until='domcontentloaded', timeout=cobertura_s * 1000)
+            LATENCIAS.anotar(tipo, time.monotonic() - inicio)
+            return page
+        except PlaywrightTimeoutError:
+            pass  # la navegación sigue viva: solo se venció el plazo de cobertura
+        finally:
+            page.remove_listener('domcontentloaded', oyente)
+
+        print(f"   🪂 {tipo}: sin respuesta en {cobertura_s:.1f} s, se lanza una navegación de cobertura")
+        oyente = vigilar(page, 'principal')
+        respaldo = page.context.new_page()
+        vigilar(respaldo, 'respaldo')
+        inicio_respaldo = time.monotonic()
+        try:
+            # Sin goto: bloquearía hasta que cargue y no podríamos mirar las dos
+            respaldo.evaluate("u => { window.location.href = u; }", url)
+        except Exception:
+            pass  # la navegación arrancó y se llevó el contexto de ejecución
+
+        while not listas and time.monotonic() - inicio < limite_s:
+            page.wait_for_timeout(100)  # acá se despachan los eventos de las dos páginas
+        page.remove_listener('domcontentloaded', oyente)
+
+        if not listas:
+            respaldo.close()
+            raise PlaywrightTimeoutError(f"{url}: sin domcontentloaded en {limite_s:.0f} s")
+        ganadora = min(listas, key=listas.get)
+        if ganadora == 'respaldo':
+            LATENCIAS.anotar(tipo, listas['respaldo'] - inicio_respaldo)
+            page.close()
+            print(f"   🪂 {tipo}: ganó la cobertura")
+            return respaldo
+        LATENCIAS.anotar(tipo, listas['principal'] - inicio)
+        respaldo.close()
+        return page
+
     # ----------------------------------------
     # PROCESAR UNA TARJETA DE RESULTADO
     # ----------------------------------------
 
-    def _procesar_tarjeta(self, tarjeta, previos: dict = None):
+    def _leer_tarjeta(self, tarjeta):
         """El enlace <a href="/loto-hn/<slug>/"> envuelve toda la tarjeta del
         sorteo: la etiqueta con la fecha, el nombre y las bolas.
 
-        Retorna (resultado, motivo_descarte). El motivo solo se llena cuando la
-        tarjeta era de un juego vigente pero no se pudo usar."""
-        previos = previos or {}
+        Retorna lo crudo — {href, bolas, etiqueta o texto, origen} — o None si
+        la tarjeta no es de un juego vigente."""
         href = tarjeta.get_attribute('href') or ''
         if '/estadisticas/' in href:
-            return None, None  # tarjeta de "Números Calientes", no es un resultado
+            return None  # tarjeta de "Números Calientes", no es un resultado
+        if href.strip('/').split('/')[-1] not in JUEGOS:
+            return None
+
+        crudo = {'href': href, 'bolas': self._extraer_balls(tarjeta), 'origen': 'portada'}
+        if crudo['bolas']:
+            etiqueta = tarjeta.query_selector('.bg-slate-500')
+            if etiqueta:
+                crudo['etiqueta'] = etiqueta.inner_text().strip()
+            else:
+                # Sin etiqueta se busca la fecha en el texto entero de la tarjeta
+                crudo['texto'] = tarjeta.inner_text() or ''
+        return crudo
+
+    def _fusionar_tarjetas(self, resultados: dict, crudos: list, previos: dict = None) -> list:
+        """Interpreta las tarjetas crudas de la portada sobre `resultados`.
+        Retorna los motivos de descarte."""
+        descartes = []
+        for crudo in crudos:
+            resultado, motivo = self._procesar_crudo(crudo, previos)
+            if motivo:
+                descartes.append(motivo)
+            if not resultado:
+                continue
+            key = resultado['juego']
+            # La fuente muestra el mismo juego varias veces (feed "En Directo"
+            # + grilla de resultados). Nos quedamos con el sorteo más nuevo,
+            # no con el que venga primero en el DOM.
+            if key in resultados and not self._es_mas_reciente(resultado, resultados[key]):
+                continue
+            resultados[key] = resultado
+            self._informar(resultado)
+        return descartes
 
-        slug = href.strip('/').split('/')[-1]
+    def _procesar_crudo(self, crudo: dict, previos: dict = None):
+        """Retorna (resultado, motivo_descarte). El motivo solo se llena cuando la
+        tarjeta era de un juego vigente pero no se pudo usar."""
+        previos = previos or {}
+        slug = crudo['href'].strip('/').split('/')[-1]
         juego = JUEGOS.get(slug)
         if not juego:
             return None, None
 
-        numeros = self._extraer_balls(tarjeta)
+        numeros = crudo['bolas']
         if not numeros:
             return None, f"{slug}: tarjeta sin números (sorteo aún sin publicar)"
 
-        fecha_etiqueta = self._extraer_fecha(tarjeta)
+        texto = crudo['etiqueta'] if 'etiqueta' in crudo else crudo.get('texto', '')
+        fecha_etiqueta = self._fecha_desde_texto(texto)
         if fecha_etiqueta:
             fecha_sorteo = fecha_etiqueta - timedelta(days=DESFASE_UTC_DIAS[juego['hora']])
             origen = 'etiqueta'
@@ -487,7 +1021,7 @@ class LotoHondurasScraper:
         for slug, juego in faltantes:
             url = f"{self.BASE_URL}loto-hn/{slug}/"
             try:
-                page.goto(url, wait_until='domcontentloaded', timeout=60000)
+                page = self._navegar_cubierto(page, url, 'pagina')
                 page.wait_for_selector(SELECTOR_BOLAS, timeout=20000)
                 self._esperar_tarjetas_estables(page, selector=SELECTOR_BOLAS)
                 filas = page.evaluate(self.JS_FILAS)
@@ -495,54 +1029,55 @@ class LotoHondurasScraper:
                 notas.append(f"{slug}: no se pudo leer su página ({type(e).__name__})")
                 continue
 
-            mejor = None
-            for fila in filas:
-                fecha = self._fecha_desde_texto(fila['fecha'])
-                if not fecha or not fila['nums']:
-                    continue
-                # La fuente fecha en UTC también acá: mismo desfase que la portada
-                sorteo = fecha - timedelta(days=DESFASE_UTC_DIAS[juego['hora']])
-                if mejor is None or sorteo > mejor[0]:
-                    mejor = (sorteo, fila['nums'])
+            self.crudos += [{'href': f"/loto-hn/{slug}/", 'etiqueta': f['fecha'],
+                             'bolas': f['nums'], 'origen': 'pagina_juego'} for f in filas]
+            nota = self._aplicar_pagina(slug, juego, filas, resultados)
+            if nota:
+                notas.append(nota)
 
-            if not mejor:
-                notas.append(f"{slug}: su página no trae ninguna fila utilizable")
-                continue
+        return notas
 
-            fecha_sorteo, nums = mejor
-            ganador, adicionales, individuales, extras = self._formatear_numeros(nums, juego['key'])
-            if not ganador:
-                notas.append(f"{slug}: no se pudo interpretar {nums} de su página")
+    def _aplicar_pagina(self, slug: str, juego: dict, filas: list, resultados: dict):
+        """Usa la fila más nueva de la página del juego si mejora lo que hay.
+        Retorna el motivo si no se usó."""
+        mejor = None
+        for fila in filas:
+            fecha = self._fecha_desde_texto(fila['fecha'])
+            if not fecha or not fila['nums']:
                 continue
+            # La fuente fecha en UTC también acá: mismo desfase que la portada
+            sorteo = fecha - timedelta(days=DESFASE_UTC_DIAS[juego['hora']])
+            if mejor is None or sorteo > mejor[0]:
+                mejor = (sorteo, fila['nums'])
 
-            nuevo = self._armar_resultado(juego, fecha_sorteo, ganador, adicionales,
-                                          individuales, extras, 'pagina_juego')
-            actual = resultados.get(juego['key'])
-            if actual:
-                # La página puede ir más atrasada que la portada, o traer lo mismo
-                if nuevo['fecha_historial'] < actual['fecha_historial']:
-                    notas.append(f"{slug}: su página está más atrasada que la portada")
-                    continue
-                if (nuevo['fecha_historial'] == actual['fecha_historial']
-                        and len(adicionales) <= len(actual['numeros_adicionales'])):
-                    notas.append(f"{slug}: su página tampoco trae los valores que faltan")
-                    continue
-
-            resultados[juego['key']] = nuevo
-            print(f"   ✅ {juego['nombre']}: {ganador} | {fecha_sorteo:%Y-%m-%d} "
-                  f"| pagina_juego | todos: {adicionales}")
+        if not mejor:
+            return f"{slug}: su página no trae ninguna fila utilizable"
 
-        return notas
+        fecha_sorteo, nums = mejor
+        ganador, adicionales, individuales, extras = self._formatear_numeros(nums, juego['key'])
+        if not ganador:
+            return f"{slug}: no se pudo interpretar {nums} de su página"
+
+        nuevo = self._armar_resultado(juego, fecha_sorteo, ganador, adicionales,
+                                      individuales, extras, 'pagina_juego')
+        actual = resultados.get(juego['key'])
+        if actual:
+            # La página puede ir más atrasada que la portada, o traer lo mismo
+            if nuevo['fecha_historial'] < actual['fecha_historial']:
+                return f"{slug}: su página está más atrasada que la portada"
+            if (nuevo['fecha_historial'] == actual['fecha_historial']
+                    and len(adicionales) <= len(actual['numeros_adicionales'])):
+                return f"{slug}: su página tampoco trae los valores que faltan"
+
+        resultados[juego['key']] = nuevo
+        print(f"   ✅ {juego['nombre']}: {ganador} | {fecha_sorteo:%Y-%m-%d} "
+              f"| pagina_juego | todos: {adicionales}")
+        return None
 
     # ----------------------------------------
     # FECHA DE LA TARJETA (etiqueta "dd-mm")
     # ----------------------------------------
 
-    def _extraer_fecha(self, tarjeta):
-        etiqueta = tarjeta.query_selector('.bg-slate-500')
-        texto = etiqueta.inner_text().strip() if etiqueta else (tarjeta.inner_text() or '')
-        return self._fecha_desde_texto(texto)
-
     @staticmethod
     def _fecha_desde_texto(texto: str):
         m = re.search(r'\b(\d{2})-(\d{2})\b', texto or '')
@@ -653,62 +1188,283 @@ class LotoHondurasScraper:
 
     def guardar_historial_json(self, resultados: dict, archivo='historial.json') -> bool:
         try:
-            historial = {}
-            if os.path.exists(archivo):
-                with open(archivo, 'r', encoding='utf-8') as f:
-                    historial = json.load(f)
-
-            hoy = fecha_hn_str('%Y-%m-%d')
-            nuevos, corregidos = 0, 0
-            for key, data in resultados.items():
-                # Cada tarjeta trae su propia fecha, así que un sorteo viejo que
-                # siga en pantalla se guarda en su día y no en el de hoy
-                fecha_key = data['fecha_historial']
-                if fecha_key > hoy:
-                    # Una etiqueta mal leída no debe abrir un día en el futuro
-                    print(f"   ⏭️  Ignorado {key}: fecha futura {fecha_key}")
-                    continue
-                if fecha_key not in historial:
-                    historial[fecha_key] = {}
-                anterior = historial[fecha_key].get(key)
-                # Solo guardamos los números — la key ya codifica juego + tanda
-                nums = data['numeros_adicionales']
-                if anterior == nums:
-                    continue
-                if anterior is None:
-                    nuevos += 1
-                else:
-                    # La fuente manda: si lo guardado no coincide, estaba mal
-                    print(f"   ♻️  Corregido {fecha_key}/{key}: {anterior} → {nums}")
-                    corregidos += 1
-                historial[fecha_key][key] = nums
+            historial = historial_mensual.cargar(compatible=archivo)
 
-            with open(archivo, 'w', encoding='utf-8') as f:
-                json.dump(historial, f, ensure_ascii=False, separators=(',', ':'))
+            nuevos, corregidos, cambiados = self.fusionar_historial(
+                historial, resultados, fecha_hn_str('%Y-%m-%d'))
+
+            # Solo se reescriben los meses que cambiaron (en general, el actual)
+            meses = historial_mensual.guardar(historial, {f[:7] for f, _, _ in cambiados},
+                                              compatible=archivo)
+
+            self._actualizar_indice(historial, cambiados)
 
             fecha_hn = fecha_hn_str('%Y-%m-%d')
-            print(f"📚 Historial guardado: {archivo} | {nuevos} nuevos | {corregidos} corregidos "
+            print(f"📚 Historial guardado: {historial_mensual.DIRECTORIO}/ "
+                  f"({', '.join(meses) or 'sin cambios'}) | {nuevos} nuevos | {corregidos} corregidos "
                   f"| {fecha_hn}: {len(historial.get(fecha_hn, {}))} sorteos")
             return True
         except Exception as e:
             print(f"❌ Error al guardar historial: {e}")
             return False
 
+    @staticmethod
+    def fusionar_historial(historial: dict, resultados: dict, hoy: str, avisar: bool = True):
+        """Vuelca los resultados en el historial. Retorna (nuevos, corregidos,
+        [(fecha, key, nums)] de lo que cambió)."""
+        nuevos, corregidos = 0, 0
+        cambiados = []
+        for key, data in resultados.items():
+            # Cada tarjeta trae su propia fecha, así que un sorteo viejo que
+            # siga en pantalla se guarda en su día y no en el de hoy
+            fecha_key = data['fecha_historial']
+            if fecha_key > hoy:
+                # Una etiqueta mal leída no debe abrir un día en el futuro
+                if avisar:
+                    print(f"   ⏭️  Ignorado {key}: fecha futura {fecha_key}")
+                continue
+            if fecha_key not in historial:
+                historial[fecha_key] = {}
+            anterior = historial[fecha_key].get(key)
+            # Solo guardamos los números — la key ya codifica juego + tanda
+            nums = data['numeros_adicionales']
+            if anterior == nums:
+                continue
+            if anterior is None:
+                nuevos += 1
+            else:
+                # La fuente manda: si lo guardado no coincide, estaba mal
+                if avisar:
+                    print(f"   ♻️  Corregido {fecha_key}/{key}: {anterior} → {nums}")
+                corregidos += 1
+            historial[fecha_key][key] = nums
+            cambiados.append((fecha_key, key, nums))
+        return nuevos, corregidos, cambiados
+
+    @staticmethod
+    def _actualizar_indice(historial: dict, cambiados: list, archivo=INDICE):
+        """Suma al índice de combinaciones solo los sorteos nuevos o corregidos."""
+        if not cambiados and os.path.exists(archivo):
+            return
+        try:
+            indice = IndiceCombinaciones.cargar(archivo, historial)
+            for fecha_key, key, nums in cambiados:
+                indice.agregar(fecha_key, key, nums)
+            indice.guardar(archivo)
+        except Exception as e:
+            # El índice se puede rearmar desde el historial: no vale perder la corrida
+            print(f"⚠️  No se pudo actualizar {archivo}: {e}")
+
 
 # ============================================
-# MAIN
+# GRABAR Y REPRODUCIR LA FUENTE
 # ============================================
+#
+# Probar un cambio en SELECTOR_BOLAS, JS_FILAS o la lógica de fechas solo se
+# podía contra el sitio en vivo, que es lento y cambia de un momento a otro.
+#
+#   python loto_scraper.py --grabar grabaciones/portada.har
+#   python loto_scraper.py --reproducir grabaciones/portada.har
+#
+# Grabar hace una corrida real y guarda, junto al HAR, la hora HN, los previos y
+# los resultados obtenidos. Reproducir sirve ese HAR al navegador sin tocar la
+# red, con el reloj congelado en la hora grabada, y compara contra lo que salió
+# entonces. Ninguno de los dos modos escribe los JSON ni manda avisos.
+
+# Campos que cambian en cada corrida y no cuentan para comparar
+CAMPOS_VOLATILES = ('fecha_consulta',)
+
+
+def _meta_grabacion(har: str) -> str:
+    return har + '.meta.json'
+
+
+def grabar_fuente(har: str) -> dict:
+    os.makedirs(os.path.dirname(har) or '.', exist_ok=True)
+    previos = cargar_previos('resultados_hoy.json')
+    hora = ahora_hn()
+    inicio = time.monotonic()
+    resultados = LotoHondurasScraper(har=har, grabar=True).obtener_resultados(previos)
+    print(f"⏱️  Corrida grabada en {time.monotonic() - inicio:.1f} s")
+    with open(_meta_grabacion(har), 'w', encoding='utf-8') as f:
+        json.dump({'hora_hn': hora.isoformat(), 'previos': previos,
+                   'resultados': resultados}, f, ensure_ascii=False, indent=2)
+    print(f"💾 Grabación: {har} + {_meta_grabacion(har)}")
+    return resultados
+
+
+def reproducir_fuente(har: str) -> bool:
+    """Corre obtener_resultados contra la grabación. True si coincide con lo grabado."""
+    global HORA_FIJA
+    with open(_meta_grabacion(har), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    HORA_FIJA = datetime.fromisoformat(meta['hora_hn'])
+    print(f"⏰ Reloj congelado en {HORA_FIJA:%Y-%m-%d %H:%M} HN")
+
+    inicio = time.monotonic()
+    resultados = LotoHondurasScraper(har=har).obtener_resultados(meta.get('previos') or {})
+    print(f"⏱️  Corrida reproducida en {time.monotonic() - inicio:.1f} s")
+
+    diferencias = comparar_resultados(meta.get('resultados') or {}, resultados)
+    if diferencias:
+        print(f"❌ {len(diferencias)} diferencia(s) con lo grabado:")
+        for d in diferencias:
+            print(f"   · {d}")
+        return False
+    print("✅ Mismos resultados que en la grabación")
+    return True
+
+
+def comparar_resultados(esperados: dict, obtenidos: dict) -> list:
+    diferencias = []
+    for key in sorted(set(esperados) | set(obtenidos)):
+        antes, ahora = esperados.get(key), obtenidos.get(key)
+        if antes is None or ahora is None:
+            diferencias.append(f"{key}: {'falta' if ahora is None else 'sobra'}")
+            continue
+        for campo in sorted(set(antes) | set(ahora)):
+            if campo not in CAMPOS_VOLATILES and antes.get(campo) != ahora.get(campo):
+                diferencias.append(f"{key}.{campo}: {antes.get(campo)} → {ahora.get(campo)}")
+    return diferencias
+
+
+def _valor_argumento(nombre: str):
+    """Valor que sigue a `nombre` en la línea de comandos, o None."""
+    if nombre in sys.argv:
+        i = sys.argv.index(nombre)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        print(f"❌ {nombre} necesita una ruta")
+        sys.exit(2)
+    return None
 
-if __name__ == "__main__":
-    # Modo aparte que el workflow invoca DESPUÉS del git push. El purgado no
-    # puede ir dentro de la corrida del scraper: en ese momento los JSON nuevos
-    # solo existen en el runner, así que vaciar el borde mientras el origen
-    # todavía sirve los resultados de ayer hace que la primera visita vuelva a
-    # cachear justo lo viejo, y ahí se queda hasta que expire el TTL.
-    if "--purgar-cache" in sys.argv:
-        purgar_cache_cloudflare()
-        sys.exit(0)
 
+# ============================================
+# REPROCESAR EL ARCHIVO CRUDO
+# ============================================
+#
+# Cuando se corrige _formatear_numeros, _fecha_desde_texto o DESFASE_UTC_DIAS,
+# lo que ya guardaron las corridas anteriores sigue mal. Con lo crudo de cada
+# corrida en archivo_crudo/ se vuelve a interpretar todo con el código actual:
+#
+#   python loto_scraper.py --reprocesar              # reescribe historial.json
+#   python loto_scraper.py --reprocesar --verificar  # solo lista diferencias
+#
+# Cada corrida se interpreta con el reloj congelado en su hora y con sus
+# propios previos, así que los archivos se procesan en paralelo; después se
+# vuelcan en orden. Solo se reescriben los pares (fecha, juego) que el archivo
+# vuelve a producir: lo que el archivo no cubre (corridas que se cayeron antes
+# de archivar, arreglos a mano) se deja como está y se informa.
+
+def _reprocesar_registro(registro: dict) -> dict:
+    global HORA_FIJA
+    HORA_FIJA = datetime.fromisoformat(registro['hora_hn'])
+    try:
+        scraper = LotoHondurasScraper()
+        tarjetas = registro.get('tarjetas') or []
+        de = lambda origen: [t for t in tarjetas if t.get('origen') == origen]
+
+        # Mismo orden que obtener_resultados: datos de la fuente, portada y
+        # por último las páginas de cada juego
+        resultados, _ = scraper._resultados_desde_filas(de('datos_fuente'))
+        scraper._fusionar_tarjetas(resultados, de('portada'), registro.get('previos'))
+        paginas = {}
+        for t in de('pagina_juego'):
+            slug = t['href'].strip('/').split('/')[-1]
+            paginas.setdefault(slug, []).append({'fecha': t.get('etiqueta'), 'nums': t['bolas']})
+        for slug, filas in paginas.items():
+            if slug in JUEGOS:
+                scraper._aplicar_pagina(slug, JUEGOS[slug], filas, resultados)
+        return resultados
+    finally:
+        HORA_FIJA = None
+
+
+def _reprocesar_archivo(ruta: str) -> tuple:
+    """([(hora_hn, resultados)] de cada corrida del archivo, truncado). Corre en
+    otro proceso."""
+    registros, truncado = archivo_crudo.leer(ruta)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [(r['hora_hn'], _reprocesar_registro(r)) for r in registros], truncado
+
+
+def reprocesar(verificar: bool = False, archivo: str = 'historial.json',
+               directorio: str = archivo_crudo.DIRECTORIO) -> bool:
+    rutas = archivo_crudo.archivos(directorio)
+    if not rutas:
+        print(f"❌ No hay nada archivado en {directorio}/")
+        return False
+
+    inicio = time.monotonic()
+    with ProcessPoolExecutor() as pool:
+        lotes = list(pool.map(_reprocesar_archivo, rutas))
+    corridas = sorted((c for lote, _ in lotes for c in lote),
+                      key=lambda c: datetime.fromisoformat(c[0]))
+    print(f"🔁 {len(corridas)} corridas de {len(rutas)} archivo(s) reinterpretadas "
+          f"en {time.monotonic() - inicio:.1f} s")
+    for ruta, (lote, truncado) in zip(rutas, lotes):
+        if truncado:
+            print(f"⚠️  {ruta}: termina en una corrida cortada, se usan las {len(lote)} legibles")
+    if not corridas:
+        print(f"❌ {directorio}/ no tiene ninguna corrida legible")
+        return False
+
+    actual = historial_mensual.cargar(compatible=archivo)
+
+    desde = corridas[0][0][:10]
+    reproducido = {}
+    for hora, resultados in corridas:
+        LotoHondurasScraper.fusionar_historial(reproducido, resultados, hora[:10], avisar=False)
+
+    nuevo = {fecha: dict(sorteos) for fecha, sorteos in actual.items()}
+    diferencias, tocados = [], set()
+    for fecha in sorted(reproducido):
+        for key, nums in reproducido[fecha].items():
+            antes = actual.get(fecha, {}).get(key)
+            if antes != nums:
+                diferencias.append(f"{fecha}/{key}: {antes} → {nums}")
+                nuevo.setdefault(fecha, {})[key] = nums
+                tocados.add(fecha[:7])
+    nuevo = dict(sorted(nuevo.items()))
+
+    # Lo guardado que el archivo no puede volver a producir se conserva
+    sin_respaldo = [f"{fecha}/{key}" for fecha in sorted(actual) if fecha >= desde
+                    for key in actual[fecha]
+                    if key in KEYS_VIGENTES and key not in reproducido.get(fecha, {})]
+    if sin_respaldo:
+        print(f"ℹ️  {len(sin_respaldo)} sorteo(s) desde {desde} que el archivo no cubre "
+              f"(se conservan):")
+        for d in sin_respaldo[:20]:
+            print(f"   · {d}")
+        if len(sin_respaldo) > 20:
+            print(f"   · ... y {len(sin_respaldo) - 20} más")
+
+    if not diferencias:
+        print(f"✅ {archivo} coincide con el archivo crudo (desde {desde})")
+        return True
+    print(f"{'❌' if verificar else '♻️ '} {len(diferencias)} diferencia(s) con {archivo}:")
+    for d in diferencias[:50]:
+        print(f"   · {d}")
+    if len(diferencias) > 50:
+        print(f"   · ... y {len(diferencias) - 50} más")
+    if verificar:
+        return False
+
+    historial_mensual.guardar(nuevo, tocados, compatible=archivo)
+    indice = IndiceCombinaciones()
+    indice.agregar_historial(nuevo)
+    indice.guardar(INDICE)
+    print(f"💾 {len(tocados)} mes(es) de {historial_mensual.DIRECTORIO}/ y {archivo} "
+          f"reconstruidos, índice de combinaciones rearmado")
+    return True
+
+
+# ============================================
+# MAIN
+# ============================================
+
+def main(perfil: Perfil = None):
+    perfil = perfil or Perfil("loto_scraper")
     scraper = LotoHondurasScraper()
 
     print("🎲 LOTO HONDURAS SCRAPER — fuente: loteriasdehonduras.com")
@@ -716,13 +1472,23 @@ if __name__ == "__main__":
     print(f"⏰ Hora HN: {fecha_hn_str('%Y-%m-%d %H:%M')}")
     print("=" * 60)
 
-    resultados = scraper.obtener_resultados(cargar_previos('resultados_hoy.json'))
+    previos = cargar_previos('resultados_hoy.json')
+    with perfil.fase("obtener_resultados"):
+        resultados = scraper.obtener_resultados(previos)
+
+    # Lo crudo se archiva siempre, aunque no haya salido nada útil: es lo que
+    # permite reinterpretar esta corrida cuando se corrija el parser
+    if scraper.crudos:
+        archivo_crudo.archivar(scraper.crudos, previos, ahora_hn())
 
     if not resultados:
-        alerta_error_scraping("No se obtuvo ningún resultado de loteriasdehonduras.com")
+        alerta_error_scraping(scraper.diagnostico
+                              or "No se obtuvo ningún resultado de loteriasdehonduras.com")
     else:
-        guardados = scraper.guardar_resultados_json(resultados, 'resultados_hoy.json')
-        scraper.guardar_historial_json(resultados, 'historial.json')
+        with perfil.fase("guardar_resultados_json"):
+            guardados = scraper.guardar_resultados_json(resultados, 'resultados_hoy.json')
+        with perfil.fase("guardar_historial_json"):
+            scraper.guardar_historial_json(resultados, 'historial.json')
 
         # Un juego que la fuente no devolvió conserva el resultado anterior: hay
         # que decirlo, porque si no parece que todo se actualizó cuando no fue así
@@ -732,12 +1498,15 @@ if __name__ == "__main__":
             print(f"🕓 Juegos sin el resultado que ya tocaba ({len(problemas)}):")
             for nombre, motivo in problemas:
                 print(f"   · {nombre}: {motivo}")
+            # Se agrupa por los juegos atrasados: mientras sean los mismos es la
+            # misma alerta, aunque el detalle de cada uno cambie entre corridas
             alerta_error_scraping(
                 f"{len(problemas)} juego(s) sin actualizar: "
-                + ", ".join(f"{n} ({m})" for n, m in problemas)
+                + ", ".join(f"{n} ({m})" for n, m in problemas),
+                clave="atrasados:" + ",".join(sorted(n for n, _ in problemas))
             )
 
-        # El purgado de Cloudflare NO va acá: corre como paso propio del
+        # El purgado de Cloudflare NO va acá: lo hace publicar.py en el
         # workflow, ya publicados los JSON (ver --purgar-cache arriba).
         resumen_telegram(resultados)
 
@@ -748,3 +1517,35 @@ if __name__ == "__main__":
         print(f"✅ {data['nombre_juego']}: {data['numero_ganador']} "
               f"| {data['fecha_sorteo']} | {data['hora_sorteo']}")
     print("=" * 60)
+
+
+if __name__ == "__main__":
+    # Modo aparte que el workflow invoca DESPUÉS del git push. El purgado no
+    # puede ir dentro de la corrida del scraper: en ese momento los JSON nuevos
+    # solo existen en el runner, así que vaciar el borde mientras el origen
+    # todavía sirve los resultados de ayer hace que la primera visita vuelva a
+    # cachear justo lo viejo, y ahí se queda hasta que expire el TTL.
+    #
+    # Lo corre ahora publicar.py junto con el deploy hook y Telegram; esto queda
+    # para lanzarlo a mano.
+    if "--purgar-cache" in sys.argv:
+        purgar_cache_cloudflare()
+        sys.exit(0)
+
+    if _valor_argumento("--grabar"):
+        grabar_fuente(_valor_argumento("--grabar"))
+        sys.exit(0)
+
+    if _valor_argumento("--reproducir"):
+        sys.exit(0 if reproducir_fuente(_valor_argumento("--reproducir")) else 1)
+
+    if "--reprocesar" in sys.argv:
+        sys.exit(0 if reprocesar(verificar="--verificar" in sys.argv) else 1)
+
+    # --profile: muestreo de pilas + pico de memoria por fase (ver perfilado.py)
+    # Con try/finally: la corrida que revienta es la que más interesa perfilar
+    perfil = Perfil("loto_scraper", activo="--profile" in sys.argv).iniciar()
+    try:
+        main(perfil)
+    finally:
+        perfil.terminar()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Avisos a Telegram con bandeja de salida persistente.
+
+Antes cada aviso era un `requests.post` bloqueante dentro del scraper, y como el
+workflow corre cada pocos minutos, la misma alerta de "N juego(s) sin
+actualizar" y el mismo resumen salían en todas las corridas hasta que la fuente
+se ponía al día.
+
+Acá cada mensaje se encola con una CLAVE (lo que lo identifica, sin la hora) y
+solo se manda si esa clave no salió ya dentro de su ventana. La bandeja vive en
+disco: lo que no se alcanzó a mandar sale en la corrida siguiente, y lo ya
+mandado no se repite aunque cambie el proceso. El scraper solo encola: quien
+manda es publicar.py, que vacía la bandeja con una sesión HTTP compartida en
+paralelo con el purgado y el despliegue.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Se puede apuntar a un servidor local para probar sin molestar al bot real
+TELEGRAM_API = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+BANDEJA = os.path.join("estado", "notificaciones.json")
+
+# Cuánto tiempo se considera repetido un mensaje con la misma clave
+VENTANA_ALERTA_S  = 3 * 3600   # una alerta que sigue vigente se recuerda cada 3 h
+VENTANA_RESUMEN_S = 24 * 3600  # un resumen idéntico no se vuelve a mandar
+
+# Un aviso que lleva más de esto en la bandeja ya no le sirve a nadie
+MAX_EDAD_PENDIENTE_S = 12 * 3600
+
+# Lo que pasó al encolar un aviso
+ENCOLADO = "encolado"  # nuevo en la bandeja
+EN_COLA  = "en_cola"   # la misma clave ya esperaba salir: se actualizó su texto
+REPETIDO = "repetido"  # la misma clave ya salió dentro de su ventana
+
+MAX_INTENTOS    = 4
+ESPERA_BASE_S   = 1.0
+ESPERA_MAXIMA_S = 30.0
+TIMEOUT_HTTP_S  = 10
+
+
+def huella(clave: str) -> str:
+    return hashlib.sha256(clave.encode("utf-8")).hexdigest()[:16]
+
+
+def crear_sesion(conexiones: int = 8) -> requests.Session:
+    """Sesión con pool propio: todos los envíos reutilizan la misma conexión TLS."""
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=conexiones, pool_maxsize=conexiones)
+    sesion.mount("https://", adaptador)
+    sesion.mount("http://", adaptador)
+    return sesion
+
+
+class Bandeja:
+    """Cola persistente de mensajes + registro de lo ya enviado, por huella."""
+
+    def __init__(self, archivo: str = BANDEJA):
+        self.archivo = archivo
+        self._lock = threading.RLock()
+        self.pendientes, self.enviados = self._leer()
+
+    def _leer(self):
+        try:
+            with open(self.archivo, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("pendientes", []), data.get("enviados", {})
+        except (OSError, ValueError):
+            return [], {}
+
+    def guardar(self):
+        with self._lock:
+            ahora = time.time()
+            # Lo enviado hace más de la ventana más larga ya no deduplica nada
+            self.enviados = {h: t for h, t in self.enviados.items()
+                             if ahora - t < max(VENTANA_ALERTA_S, VENTANA_RESUMEN_S)}
+            os.makedirs(os.path.dirname(self.archivo) or ".", exist_ok=True)
+            temporal = self.archivo + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump({"pendientes": self.pendientes, "enviados": self.enviados},
+                          f, ensure_ascii=False, indent=2)
+            # Reemplazo atómico: un corte a mitad de escritura no pierde la bandeja
+            os.replace(temporal, self.archivo)
+
+    def encolar(self, texto: str, clave: str = None, silencioso: bool = False,
+                ventana: int = VENTANA_ALERTA_S) -> str:
+        """Retorna ENCOLADO, EN_COLA o REPETIDO."""
+        h = huella(clave if clave is not None else texto)
+        with self._lock:
+            ultimo = self.enviados.get(h)
+            if ultimo is not None and time.time() - ultimo < ventana:
+                return REPETIDO
+            for pendiente in self.pendientes:
+                if pendiente["huella"] == h:
+                    # Misma clave aún sin salir: nos quedamos con el texto más nuevo
+                    pendiente.update(texto=texto, silencioso=silencioso)
+                    self.guardar()
+                    return EN_COLA
+            self.pendientes.append({"huella": h, "texto": texto, "silencioso": silencioso,
+                                    "creado": time.time(), "intentos": 0})
+            self.guardar()
+            return ENCOLADO
+
+    def siguiente(self):
+        with self._lock:
+            ahora = time.time()
+            vencidos = [p for p in self.pendientes if ahora - p["creado"] > MAX_EDAD_PENDIENTE_S]
+            for p in vencidos:
+                print(f"   🗑️  Aviso descartado por viejo: {p['texto'].splitlines()[0]}")
+                self.pendientes.remove(p)
+            if vencidos:
+                self.guardar()
+            return self.pendientes[0] if self.pendientes else None
+
+    def marcar_enviado(self, pendiente: dict):
+        with self._lock:
+            self.enviados[pendiente["huella"]] = time.time()
+            if pendiente in self.pendientes:
+                self.pendientes.remove(pendiente)
+            self.guardar()
+
+    def descartar(self, pendiente: dict):
+        with self._lock:
+            if pendiente in self.pendientes:
+                self.pendientes.remove(pendiente)
+            self.guardar()
+
+
+class Notificador:
+    """Encola avisos en la bandeja y, desde publicar.py, los despacha respetando los 429."""
+
+    def __init__(self, token: str, chat_id: str, bandeja: Bandeja = None,
+                 sesion: requests.Session = None, api: str = TELEGRAM_API):
+        self.token = token
+        self.chat_id = chat_id
+        self.api = api
+        self.bandeja = bandeja or Bandeja()
+        self.sesion = sesion or crear_sesion()
+
+    @property
+    def configurado(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    def encolar(self, texto: str, clave: str = None, silencioso: bool = False,
+                ventana: int = VENTANA_ALERTA_S):
+        """Estado de Bandeja.encolar, o None si Telegram no está configurado."""
+        if not self.configurado:
+            print("⚠️  Telegram no configurado (faltan variables de entorno)")
+            return None
+        estado = self.bandeja.encolar(texto, clave, silencioso, ventana)
+        if estado == REPETIDO:
+            print("   ⏭️  Aviso omitido: ya se mandó uno igual hace poco")
+        elif estado == EN_COLA:
+            print("   📬 Aviso ya en la bandeja sin salir: se actualiza su texto")
+        return estado
+
+    def despachar(self, plazo: float = None) -> int:
+        """Manda todo lo pendiente, en orden. Retorna cuántos salieron."""
+        if not self.configurado:
+            return 0
+        limite = time.monotonic() + plazo if plazo else None
+        enviados = 0
+        while True:
+            pendiente = self.bandeja.siguiente()
+            if not pendiente:
+                return enviados
+            resultado = self._enviar(pendiente, limite)
+            if resultado is None:
+                return enviados  # sin plazo o sin red: sigue en la bandeja
+            if resultado:
+                self.bandeja.marcar_enviado(pendiente)
+                enviados += 1
+            else:
+                self.bandeja.descartar(pendiente)
+
+    def _enviar(self, pendiente: dict, limite: float = None):
+        """True = enviado, False = rechazado para siempre, None = reintentar luego."""
+        url = f"{self.api}/bot{self.token}/sendMessage"
+        payload = {
+            "chat_id": self.chat_id,
+            "text": pendiente["texto"],
+            "parse_mode": "HTML",
+            "disable_notification": pendiente["silencioso"],
+        }
+        espera = ESPERA_BASE_S
+        for intento in range(MAX_INTENTOS):
+            pendiente["intentos"] += 1
+            try:
+                resp = self.sesion.post(url, json=payload, timeout=TIMEOUT_HTTP_S)
+            except requests.RequestException as e:
+                print(f"⚠️  Error enviando a Telegram: {e}")
+                resp = None
+
+            if resp is not None:
+                if resp.ok:
+                    return True
+                if resp.status_code == 429:
+                    # Telegram dice cuánto esperar: respetarlo evita que nos bloquee más
+                    espera = self._retry_after(resp) or espera
+                elif resp.status_code < 500:
+                    print(f"⚠️  Telegram HTTP {resp.status_code}: {resp.text}")
+                    return False
+                else:
+                    print(f"⚠️  Telegram HTTP {resp.status_code}, reintentando...")
+
+            if intento == MAX_INTENTOS - 1:
+                break
+            espera = min(espera, ESPERA_MAXIMA_S)
+            if limite is not None and time.monotonic() + espera > limite:
+                break
+            time.sleep(espera)
+            espera *= 2
+        return None
+
+    @staticmethod
+    def _retry_after(resp) -> float:
+        try:
+            return float(resp.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            return 0.0
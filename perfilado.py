@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Modo --profile del scraper y del analizador.
+
+Cuando una corrida se pone lenta o come memoria no había forma de ver adentro
+sin tocar el código. Con --profile:
+
+- un hilo muestrea la pila del hilo principal cada pocos milisegundos (no
+  instrumenta cada llamada, así que casi no deforma los tiempos);
+- cada fase (`with perfil.fase('obtener_resultados'):`) mide su duración y su
+  pico de memoria con tracemalloc.
+
+Al terminar deja, junto a los JSON:
+
+- perfil_<script>.folded: pilas plegadas ("a;b;c N"), el formato que leen
+  flamegraph.pl, speedscope e inferno;
+- perfil_<script>.txt: fases y las funciones más calientes.
+
+Sin --profile, `fase()` no hace nada y no hay hilo ni tracemalloc.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+INTERVALO_MUESTREO_S = 0.005
+TOP_FUNCIONES = 25
+
+
+def _etiqueta(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+class Perfil:
+
+    def __init__(self, nombre: str, activo: bool = False,
+                 intervalo: float = INTERVALO_MUESTREO_S):
+        self.nombre = nombre
+        self.activo = activo
+        self.intervalo = intervalo
+        self.pilas = Counter()   # "fase;raíz;...;hoja" -> muestras
+        self.fases = []          # (nombre, segundos, pico de memoria en bytes)
+        self._fase_actual = None
+        self._hilo = None
+        self._detener = threading.Event()
+        self._objetivo = threading.main_thread().ident
+        self._inicio = None
+
+    def iniciar(self):
+        if not self.activo:
+            return self
+        tracemalloc.start()
+        self._inicio = time.perf_counter()
+        self._hilo = threading.Thread(target=self._muestrear, name="perfil", daemon=True)
+        self._hilo.start()
+        print(f"🔬 Perfilando {self.nombre} (muestreo cada {self.intervalo * 1000:.0f} ms)")
+        return self
+
+    @contextmanager
+    def fase(self, nombre: str):
+        if not self.activo:
+            yield
+            return
+        anterior = self._fase_actual
+        self._fase_actual = nombre
+        tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            _, pico = tracemalloc.get_traced_memory()
+            self.fases.append((nombre, time.perf_counter() - inicio, pico))
+            self._fase_actual = anterior
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self._objetivo)
+            pila = []
+            while frame is not None:
+                pila.append(_etiqueta(frame))
+                frame = frame.f_back
+            if pila:
+                pila.append(f"fase:{self._fase_actual or '-'}")
+                self.pilas[";".join(reversed(pila))] += 1
+
+    def terminar(self, directorio: str = "."):
+        """Detiene el muestreo y escribe el .folded y el reporte."""
+        if not self.activo:
+            return
+        self._detener.set()
+        self._hilo.join()
+        total_s = time.perf_counter() - self._inicio
+        _, pico_total = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        base = os.path.join(directorio, f"perfil_{self.nombre}")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for pila, n in sorted(self.pilas.items()):
+                f.write(f"{pila} {n}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.reporte(total_s, pico_total))
+        print(f"🔬 Perfil: {base}.folded | {base}.txt")
+
+    def reporte(self, total_s: float, pico_total: int) -> str:
+        muestras = sum(self.pilas.values()) or 1
+        propio, incluido = Counter(), Counter()
+        for pila, n in self.pilas.items():
+            marcos = pila.split(";")[1:]
+            propio[marcos[-1]] += n
+            for marco in set(marcos):  # la recursión no cuenta dos veces
+                incluido[marco] += n
+
+        lineas = [f"PERFIL {self.nombre} — {total_s:.2f} s, {muestras} muestras, "
+                  f"pico de memoria {pico_total / 2**20:.1f} MiB", "",
+                  "FASES", f"{'fase':<28}{'segundos':>10}{'pico MiB':>10}"]
+        for nombre, segundos, pico in self.fases:
+            lineas.append(f"{nombre:<28}{segundos:>10.2f}{pico / 2**20:>10.1f}")
+
+        for titulo, conteo in (("TIEMPO PROPIO", propio), ("TIEMPO INCLUIDO", incluido)):
+            lineas += ["", f"{titulo} (top {TOP_FUNCIONES})", f"{'%':>6}{'muestras':>10}  función"]
+            for marco, n in conteo.most_common(TOP_FUNCIONES):
+                lineas.append(f"{100 * n / muestras:>6.1f}{n:>10}  {marco}")
+        return "\n".join(lineas) + "\n"
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Efectos hacia afuera de una corrida, todos juntos y en paralelo.
+
+Después del push el workflow corría dos cosas una tras otra, cada una con su
+arranque y su conexión nueva: el purgado de Cloudflare (`loto_scraper.py
+--purgar-cache`) y un `curl` al deploy hook de Cloudflare Pages; los avisos de
+Telegram salían desde el propio scraper. Ahora el scraper solo los encola y
+todo sale desde acá, en un solo proceso, con una sesión HTTP compartida (ver
+notificaciones.crear_sesion) y plazo y reintentos propios por destino:
+
+    purgado ──► deploy hook        (en serie: el build tiene que leer el dato nuevo)
+    bandeja de Telegram            (en paralelo con lo anterior)
+
+El orden que piden los comentarios del workflow se respeta así:
+
+- el purgado solo corre con --purgar, que el workflow pasa después del push;
+- el deploy hook solo corre con --desplegar (la huella cambió) y siempre
+  después del purgado, haya salido bien o no.
+
+Al final se imprime cuánto tardó cada destino. Las URLs se pueden apuntar a
+servidores locales para probar: CF_API_URL, CF_PAGES_DEPLOY_HOOK y
+TELEGRAM_API_URL.
+
+    python publicar.py [--purgar] [--desplegar]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from notificaciones import Notificador, crear_sesion
+
+CF_API = os.environ.get("CF_API_URL", "https://api.cloudflare.com/client/v4").rstrip("/")
+
+# destino -> (timeout por intento en s, intentos)
+DESTINOS = {
+    "cloudflare":  (10, 3),
+    "deploy_hook": (15, 3),
+}
+# La bandeja tiene sus propios reintentos (y respeta los 429): solo se le da un
+# plazo total. Lo que no salga queda para la corrida siguiente.
+PLAZO_TELEGRAM_S = 20
+
+ESPERA_BASE_S = 1.0
+
+
+class Destino:
+    """Resultado de un destino para el reporte final."""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.estado = "omitido"
+        self.detalle = ""
+        self.intentos = 0
+        self.segundos = 0.0
+
+    def __repr__(self):
+        return f"Destino({self.nombre!r}, {self.estado!r})"
+
+
+def _post(sesion: requests.Session, destino: Destino, url: str, **kwargs) -> bool:
+    """POST con el plazo y los reintentos del destino. Reintenta errores de red,
+    429 y 5xx; cualquier otro código es definitivo."""
+    timeout, intentos = DESTINOS[destino.nombre]
+    inicio = time.monotonic()
+    espera = ESPERA_BASE_S
+    try:
+        for intento in range(intentos):
+            destino.intentos += 1
+            try:
+                resp = sesion.post(url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                destino.detalle = type(e).__name__
+            else:
+                if resp.ok:
+                    destino.estado, destino.detalle = "ok", f"HTTP {resp.status_code}"
+                    return True
+                destino.detalle = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                if resp.status_code != 429 and resp.status_code < 500:
+                    break
+            if intento < intentos - 1:
+                time.sleep(espera)
+                espera *= 2
+        destino.estado = "error"
+        return False
+    finally:
+        destino.segundos = time.monotonic() - inicio
+
+
+def purgar_cache_cloudflare(sesion: requests.Session = None, destino: Destino = None) -> bool:
+    destino = destino or Destino("cloudflare")
+    zona = os.environ.get("CF_ZONE_ID", "")
+    token = os.environ.get("CF_TOKEN", "")
+    if not zona or not token:
+        print("⚠️  Cloudflare no configurado (faltan CF_ZONE_ID o CF_TOKEN)")
+        destino.detalle = "sin configurar"
+        return False
+    ok = _post(sesion or crear_sesion(), destino, f"{CF_API}/zones/{zona}/purge_cache",
+               headers={"Authorization": f"Bearer {token}"},
+               json={"purge_everything": True})
+    if ok:
+        print("✅ Caché de Cloudflare purgado correctamente")
+    else:
+        print(f"⚠️  Error purgando caché: {destino.detalle}")
+    return ok
+
+
+def disparar_deploy_hook(sesion: requests.Session = None, destino: Destino = None) -> bool:
+    destino = destino or Destino("deploy_hook")
+    # La URL ya lleva el token: el secret entero es el hook
+    hook = os.environ.get("CF_PAGES_DEPLOY_HOOK", "")
+    if not hook:
+        print("⚠️  Deploy hook no configurado (falta CF_PAGES_DEPLOY_HOOK)")
+        destino.detalle = "sin configurar"
+        return False
+    ok = _post(sesion or crear_sesion(), destino, hook)
+    if ok:
+        print("✅ Despliegue de lotohn.com disparado")
+    else:
+        print(f"❌ No se pudo disparar el despliegue: {destino.detalle}")
+    return ok
+
+
+def vaciar_bandeja(notificador: Notificador, destino: Destino) -> bool:
+    if not notificador.configurado:
+        destino.detalle = "sin configurar"
+        return True
+    inicio = time.monotonic()
+    pendientes = len(notificador.bandeja.pendientes)
+    enviados = notificador.despachar(plazo=PLAZO_TELEGRAM_S)
+    destino.segundos = time.monotonic() - inicio
+    quedan = len(notificador.bandeja.pendientes)
+    destino.estado = "ok" if not quedan else "pendiente"
+    destino.detalle = f"{enviados}/{pendientes} aviso(s) enviados"
+    if quedan:
+        destino.detalle += f", {quedan} para la próxima corrida"
+    return True
+
+
+def publicar(purgar: bool, desplegar: bool, notificador: Notificador = None,
+             sesion: requests.Session = None) -> list:
+    """Corre los destinos que correspondan. Retorna sus Destino."""
+    sesion = sesion or crear_sesion()
+    notificador = notificador or Notificador(os.environ.get("TELEGRAM_BOT_TOKEN", ""),
+                                             os.environ.get("TELEGRAM_CHAT_ID", ""),
+                                             sesion=sesion)
+    cloudflare, deploy, telegram = Destino("cloudflare"), Destino("deploy_hook"), Destino("telegram")
+
+    def borde():
+        if purgar:
+            purgar_cache_cloudflare(sesion, cloudflare)
+        if desplegar:
+            disparar_deploy_hook(sesion, deploy)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        tareas = [pool.submit(borde), pool.submit(vaciar_bandeja, notificador, telegram)]
+        for tarea in tareas:
+            tarea.result()
+    return [cloudflare, deploy, telegram]
+
+
+def reporte(destinos: list, total: float):
+    iconos = {"ok": "✅", "error": "❌", "pendiente": "🕓", "omitido": "⏭️ "}
+    print("-" * 60)
+    print("📣 PUBLICACIÓN:")
+    for d in destinos:
+        detalle = f" — {d.detalle}" if d.detalle else ""
+        print(f"   {iconos[d.estado]} {d.nombre:<12} {d.segundos * 1000:>7.0f} ms{detalle}")
+    print(f"   ⏱️  total {total * 1000:.0f} ms")
+
+
+def main() -> bool:
+    inicio = time.monotonic()
+    destinos = publicar(purgar="--purgar" in sys.argv, desplegar="--desplegar" in sys.argv)
+    reporte(destinos, time.monotonic() - inicio)
+    # Como el `curl -f` de antes: un despliegue que no salió falla el paso. El
+    # purgado y Telegram solo avisan.
+    return all(d.estado != "error" for d in destinos if d.nombre == "deploy_hook")
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Endpoint HTTP local para consultar el analizador sin regenerar analisis.json.
+
+    python servidor_consultas.py --puerto 8766
+
+    GET /consulta?juego=pega_3&estadistica=frecuencias&ventana=60&tanda=9pm
+    GET /consulta?juego=super_premio&estadistica=numero&numero=07&ventana=0
+    GET /consulta?juego=juga3&desde=2026-08-01&hasta=2026-08-15
+    GET /juegos
+
+`estadistica` es una de analizador.ESTADISTICAS (por defecto 'analisis', lo
+mismo que trae analisis.json para ese juego). `ventana=0` usa todo el
+historial. Se leen solo los meses de historial/ que la consulta necesita, que
+quedan en memoria, y cada consulta se memoriza (ver analizador.ConsultasAnalisis):
+las repetidas se contestan sin recalcular.
+"""
+
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from analizador import ESTADISTICAS, JUEGOS, ConsultasAnalisis, SORTEOS_A_ANALIZAR
+from historial_mensual import DIRECTORIO
+
+
+class ManejadorConsultas(BaseHTTPRequestHandler):
+
+    consultas = None  # ConsultasAnalisis compartido por todos los hilos
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/juegos":
+            self._responder(200, {"juegos": {slug: nombre for slug, (nombre, _) in JUEGOS.items()},
+                                  "estadisticas": ESTADISTICAS})
+            return
+        if url.path != "/consulta":
+            self._responder(404, {"error": "no existe"})
+            return
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            ventana = int(params.get("ventana", SORTEOS_A_ANALIZAR)) or None
+            datos = self.consultas.consultar(
+                params.get("juego", ""),
+                params.get("estadistica", "analisis"),
+                ventana,
+                params.get("tanda") or None,
+                params.get("desde") or None,
+                params.get("hasta") or None,
+                params.get("numero") or None,
+            )
+        except ValueError as e:
+            self._responder(400, {"error": str(e)})
+            return
+        self._responder(200, datos)
+
+    def _responder(self, codigo: int, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass  # una línea por consulta taparía todo lo demás
+
+
+def servir(host: str = "127.0.0.1", puerto: int = 8766, directorio: str = DIRECTORIO):
+    ManejadorConsultas.consultas = ConsultasAnalisis(directorio)
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorConsultas)
+    print(f"🔎 Consultas en http://{host}:{puerto}/consulta (historial: {directorio}/)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def _opcion(nombre: str, defecto=None):
+    if nombre in sys.argv and sys.argv.index(nombre) + 1 < len(sys.argv):
+        return sys.argv[sys.argv.index(nombre) + 1]
+    return defecto
+
+
+if __name__ == "__main__":
+    servir(_opcion("--host", "127.0.0.1"), int(_opcion("--puerto", "8766")),
+           _opcion("--historial", DIRECTORIO))
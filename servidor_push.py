@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Servidor que empuja cada sorteo nuevo por Server-Sent Events.
+
+Los visitantes y los bots consultaban `resultados_hoy.json` una y otra vez a
+través de Cloudflare para saber si ya había sorteo, y por eso el workflow
+necesita purgar el borde y redesplegar. Acá el cliente abre una sola conexión
+(`GET /eventos`) y recibe:
+
+- al conectarse, un evento `estado` con todos los juegos;
+- después, un evento `sorteo` por juego cada vez que cambia su huella visible
+  (los CAMPOS de firma_resultados), en cuanto el scraper reescribe el archivo.
+
+Todo corre en un solo hilo con asyncio: un suscriptor ocioso es un socket y un
+objeto chico, así que miles caben en un núcleo. Al emitir, el evento se arma
+una sola vez y se escribe en cada socket sin esperar; el que no lee y acumula
+demasiado se desconecta en vez de frenar al resto.
+
+    python servidor_push.py --puerto 8765 --archivo resultados_hoy.json
+    python servidor_push.py --simular 2000 --puerto 8765   # clientes de prueba
+
+`GET /estado` devuelve lo mismo que el evento inicial, en JSON plano.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from firma_resultados import firma_sorteo, visible
+
+INTERVALO_REVISION_S = 1.0   # cada cuánto se mira el mtime del archivo
+INTERVALO_PING_S     = 20.0  # comentario SSE para que los proxies no corten
+MAX_BUFFER_CLIENTE   = 256 * 1024  # bytes sin leer antes de soltar al cliente
+TIMEOUT_CABECERAS_S  = 10.0
+
+
+class EstadoResultados:
+    """Copia en memoria de resultados_hoy.json con una huella por juego."""
+
+    def __init__(self, archivo: str = 'resultados_hoy.json'):
+        self.archivo = archivo
+        self.mtime = None
+        self.sorteos = {}
+        self.huellas = {}
+
+    def recargar(self) -> list:
+        """Relee el archivo si cambió. Retorna las claves cuya huella cambió."""
+        try:
+            mtime = os.stat(self.archivo).st_mtime_ns
+        except OSError:
+            return []
+        if mtime == self.mtime:
+            return []
+        try:
+            with open(self.archivo, encoding='utf-8') as f:
+                sorteos = json.load(f).get('sorteos', {})
+        except (OSError, ValueError):
+            return []  # el scraper está a medio escribir: se reintenta en la próxima vuelta
+        self.mtime = mtime
+
+        huellas = {clave: firma_sorteo(s) for clave, s in sorteos.items()}
+        cambiados = [clave for clave in sorted(set(huellas) | set(self.huellas))
+                     if huellas.get(clave) != self.huellas.get(clave)]
+        self.sorteos, self.huellas = sorteos, huellas
+        return cambiados
+
+    def vista(self, juegos=None) -> dict:
+        return {clave: visible(s) for clave, s in sorted(self.sorteos.items())
+                if not juegos or clave in juegos}
+
+
+def evento(tipo: str, datos, id_=None) -> bytes:
+    crudo = json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+    cabecera = f"id: {id_}\n" if id_ is not None else ""
+    return f"{cabecera}event: {tipo}\ndata: {crudo}\n\n".encode('utf-8')
+
+
+class ServidorPush:
+
+    def __init__(self, archivo: str = 'resultados_hoy.json'):
+        self.estado = EstadoResultados(archivo)
+        self.suscriptores = {}  # writer -> conjunto de juegos (vacío = todos)
+        self.emitidos = 0
+
+    # ----------------------------------------
+    # EMISIÓN
+    # ----------------------------------------
+
+    def emitir(self, cambiados: list):
+        for clave in cambiados:
+            self.emitidos += 1
+            sorteo = self.estado.sorteos.get(clave)
+            datos = {'juego': clave, 'sorteo': visible(sorteo) if sorteo else None}
+            self._difundir(evento('sorteo', datos, self.emitidos), clave)
+
+    def _difundir(self, mensaje: bytes, clave: str = None):
+        for writer, juegos in list(self.suscriptores.items()):
+            if clave and juegos and clave not in juegos:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_BUFFER_CLIENTE:
+                self._soltar(writer)
+                continue
+            writer.write(mensaje)
+
+    def _soltar(self, writer):
+        self.suscriptores.pop(writer, None)
+        writer.transport.abort()
+
+    async def vigilar(self):
+        while True:
+            cambiados = self.estado.recargar()
+            if cambiados:
+                print(f"📣 {len(cambiados)} juego(s) cambiaron → "
+                      f"{len(self.suscriptores)} suscriptor(es): {', '.join(cambiados)}")
+                self.emitir(cambiados)
+            await asyncio.sleep(INTERVALO_REVISION_S)
+
+    async def latir(self):
+        while True:
+            await asyncio.sleep(INTERVALO_PING_S)
+            self._difundir(b": ping\n\n")
+
+    # ----------------------------------------
+    # HTTP
+    # ----------------------------------------
+
+    async def atender(self, reader, writer):
+        try:
+            cabecera = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TIMEOUT_CABECERAS_S)
+            metodo, ruta, _ = cabecera.split(b"\r\n", 1)[0].decode('latin-1').split(' ', 2)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ValueError, ConnectionError):
+            writer.close()
+            return
+
+        url = urlsplit(ruta)
+        juegos = {j for v in parse_qs(url.query).get('juegos', []) for j in v.split(',') if j}
+
+        if metodo != 'GET':
+            self._responder(writer, 405, b'{"error":"solo GET"}')
+        elif url.path == '/estado':
+            crudo = json.dumps(self.estado.vista(juegos), ensure_ascii=False).encode('utf-8')
+            self._responder(writer, 200, crudo)
+        elif url.path == '/eventos':
+            await self._suscribir(reader, writer, juegos)
+            return
+        else:
+            self._responder(writer, 404, b'{"error":"no existe"}')
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    @staticmethod
+    def _responder(writer, codigo: int, cuerpo: bytes):
+        razon = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}[codigo]
+        writer.write(f"HTTP/1.1 {codigo} {razon}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     "Access-Control-Allow-Origin: *\r\n"
+                     f"Content-Length: {len(cuerpo)}\r\n"
+                     "Connection: close\r\n\r\n".encode('latin-1') + cuerpo)
+
+    async def _suscribir(self, reader, writer, juegos: set):
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                     b"Cache-Control: no-cache, no-transform\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"X-Accel-Buffering: no\r\n"
+                     b"Connection: keep-alive\r\n\r\n"
+                     b"retry: 5000\n\n")
+        writer.write(evento('estado', self.estado.vista(juegos), self.emitidos))
+        self.suscriptores[writer] = juegos
+        try:
+            # El cliente SSE no manda nada más: leer solo sirve para enterarse
+            # de que cerró, sin tener una tarea despierta por suscriptor
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.suscriptores.pop(writer, None)
+            writer.close()
+
+    async def servir(self, host: str = '127.0.0.1', puerto: int = 8765):
+        self.estado.recargar()
+        servidor = await asyncio.start_server(self.atender, host, puerto, backlog=4096)
+        print(f"📡 Eventos en http://{host}:{puerto}/eventos "
+              f"({len(self.estado.sorteos)} juegos de {self.estado.archivo})")
+        async with servidor:
+            await asyncio.gather(servidor.serve_forever(), self.vigilar(), self.latir())
+
+
+# ============================================
+# CLIENTES SIMULADOS (pruebas locales)
+# ============================================
+
+async def _cliente(host: str, puerto: int, recibidos: list, i: int):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    writer.write(f"GET /eventos HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    try:
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                return
+            if linea.startswith(b"event: "):
+                recibidos[i] += 1
+    finally:
+        writer.close()
+
+
+async def simular(n: int, host: str = '127.0.0.1', puerto: int = 8765):
+    """Abre n suscriptores y reporta cuántos eventos le llegan a cada uno."""
+    recibidos = [0] * n
+    tareas = []
+    for i in range(n):
+        tareas.append(asyncio.create_task(_cliente(host, puerto, recibidos, i)))
+        if i % 200 == 199:
+            await asyncio.sleep(0)  # no saturar el backlog del servidor
+    print(f"👥 {n} clientes conectados a {host}:{puerto}; Ctrl+C para terminar")
+    inicio = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(5)
+            vivos = sum(not t.done() for t in tareas)
+            print(f"   {time.monotonic() - inicio:5.0f} s | vivos {vivos} | "
+                  f"eventos: mín {min(recibidos)} máx {max(recibidos)}")
+    finally:
+        for t in tareas:
+            t.cancel()
+
+
+def _opcion(nombre: str, defecto=None):
+    if nombre in sys.argv and sys.argv.index(nombre) + 1 < len(sys.argv):
+        return sys.argv[sys.argv.index(nombre) + 1]
+    return defecto
+
+
+if __name__ == '__main__':
+    host = _opcion('--host', '127.0.0.1')
+    puerto = int(_opcion('--puerto', '8765'))
+    try:
+        if _opcion('--simular'):
+            asyncio.run(simular(int(_opcion('--simular')), host, puerto))
+        else:
+            asyncio.run(ServidorPush(_opcion('--archivo', 'resultados_hoy.json')).servir(host, puerto))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,74 @@
+"""Servidor HTTP local que hace de Telegram / Cloudflare en las pruebas."""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ServidorFalso:
+    """Anota cada POST (ruta, cuerpo, inicio, fin) y contesta según `guion`:
+    {prefijo_de_ruta: [(código, cuerpo_json), ...]}; agotado el guion, 200."""
+
+    def __init__(self):
+        self.pedidos = []
+        self.guion = {}
+        self.demora = 0.0
+        self._lock = threading.Lock()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_POST(self):
+                largo = int(self.headers.get("Content-Length") or 0)
+                crudo = self.rfile.read(largo) if largo else b""
+                inicio = time.monotonic()
+                time.sleep(servidor.demora)
+                codigo, cuerpo = servidor._respuesta(self.path)
+                with servidor._lock:
+                    servidor.pedidos.append({
+                        "ruta": self.path,
+                        "cuerpo": json.loads(crudo) if crudo else None,
+                        "inicio": inicio,
+                        "fin": time.monotonic(),
+                        "codigo": codigo,
+                    })
+                datos = json.dumps(cuerpo).encode("utf-8")
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.url = f"http://127.0.0.1:{self.http.server_port}"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def _respuesta(self, ruta: str):
+        with self._lock:
+            for prefijo, respuestas in self.guion.items():
+                if ruta.startswith(prefijo) and respuestas:
+                    return respuestas.pop(0)
+        return 200, {"ok": True}
+
+    def de(self, prefijo: str) -> list:
+        return [p for p in self.pedidos if p["ruta"].startswith(prefijo)]
+
+    def cerrar(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+
+@pytest.fixture
+def servidor():
+    falso = ServidorFalso()
+    yield falso
+    falso.cerrar()
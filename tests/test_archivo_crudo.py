@@ -0,0 +1,37 @@
+import os
+from datetime import datetime
+
+import archivo_crudo
+from loto_scraper import HN_TZ, reprocesar
+
+HORA = datetime(2026, 8, 20, 10, 0, tzinfo=HN_TZ)
+
+
+def _cortar(ruta, bytes_menos=10):
+    with open(ruta, "r+b") as f:
+        f.truncate(os.path.getsize(ruta) - bytes_menos)
+
+
+def test_cola_truncada_se_lee_y_se_repara(tmp_path):
+    directorio = str(tmp_path)
+    archivo_crudo.archivar([{"href": "a"}], {}, HORA, directorio)
+    ruta = archivo_crudo.archivar([{"href": "b"}], {}, HORA, directorio)
+    _cortar(ruta)
+
+    registros, truncado = archivo_crudo.leer(ruta)
+    assert truncado
+    assert [r["tarjetas"] for r in registros] == [[{"href": "a"}]]
+
+    # La corrida siguiente no queda escrita detrás de la cola rota
+    archivo_crudo.archivar([{"href": "c"}], {}, HORA, directorio)
+    registros, truncado = archivo_crudo.leer(ruta)
+    assert not truncado
+    assert [r["tarjetas"] for r in registros] == [[{"href": "a"}], [{"href": "c"}]]
+    assert os.listdir(directorio) == [os.path.basename(ruta)]
+
+
+def test_reprocesar_sin_corridas_legibles(tmp_path):
+    directorio = str(tmp_path / "crudo")
+    ruta = archivo_crudo.archivar([], {}, HORA, directorio)
+    _cortar(ruta, os.path.getsize(ruta) // 2)
+    assert reprocesar(archivo=str(tmp_path / "historial.json"), directorio=directorio) is False
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import loto_scraper
+from loto_scraper import JUEGOS, CapturaDatos, valores_esperados
+
+
+class _Contexto:
+    def on(self, evento, funcion):
+        pass
+
+
+def _captura(fecha_de):
+    captura = CapturaDatos(_Contexto())
+    captura.resultados = {
+        j['key']: {'fecha_historial': fecha_de(j['key']),
+                   'numeros_adicionales': ['01'] * valores_esperados(j['key'])}
+        for j in JUEGOS.values()
+    }
+    return captura
+
+
+def test_datos_de_ayer_no_cuentan_como_completos(monkeypatch):
+    # Jueves 22:00 HN: ya salieron los tres sorteos del día; Súper Premio, el miércoles
+    monkeypatch.setattr(loto_scraper, "HORA_FIJA",
+                        datetime(2026, 8, 20, 22, 0, tzinfo=loto_scraper.HN_TZ))
+
+    def al_dia(key):
+        return "2026-08-19" if key == "super_premio" else "2026-08-20"
+
+    assert _captura(al_dia).completo()
+    # Un blob cacheado con el 9 PM de ayer obliga a leer el DOM
+    assert not _captura(lambda k: "2026-08-19" if k.endswith("9pm") else al_dia(k)).completo()
+
+
+class _Pagina:
+    """Página de Playwright a medias: la navegación nunca llega a tiempo para
+    el goto y al rato termina en `destino` (una redirección)."""
+
+    def __init__(self, contexto, destino, carga_en):
+        self.contexto, self.destino, self.carga_en = contexto, destino, carga_en
+        self.url = "about:blank"
+        self.oyentes = []
+        self.cerrada = False
+
+    @property
+    def context(self):
+        return self.contexto
+
+    def on(self, evento, funcion):
+        self.oyentes.append(funcion)
+
+    def remove_listener(self, evento, funcion):
+        self.oyentes.remove(funcion)
+
+    def goto(self, url, wait_until, timeout):
+        raise loto_scraper.PlaywrightTimeoutError("lenta")
+
+    def evaluate(self, js, url):
+        pass
+
+    def wait_for_timeout(self, ms):
+        self.contexto.reloj += 1
+        for pagina in self.contexto.paginas:
+            if pagina.url == "about:blank" and self.contexto.reloj >= pagina.carga_en:
+                pagina.url = pagina.destino
+                for oyente in list(pagina.oyentes):
+                    oyente()
+
+    def close(self):
+        self.cerrada = True
+
+
+class _Navegador:
+    def __init__(self):
+        self.reloj = 0
+        self.paginas = []
+
+    def pagina(self, carga_en):
+        p = _Pagina(self, "https://www.loteriasdehonduras.com/", carga_en)
+        self.paginas.append(p)
+        return p
+
+    def new_page(self):
+        return self.pagina(carga_en=2)
+
+
+def test_la_cobertura_cuenta_una_carga_redirigida(monkeypatch):
+    monkeypatch.setattr(loto_scraper.LATENCIAS, "plazos", lambda tipo: (0.01, 5.0))
+    monkeypatch.setattr(loto_scraper.LATENCIAS, "anotar", lambda tipo, s: None)
+    navegador = _Navegador()
+    principal = navegador.pagina(carga_en=10 ** 6)  # trabada
+
+    ganadora = loto_scraper.LotoHondurasScraper()._navegar_cubierto(
+        principal, "https://loteriasdehonduras.com/", "portada")
+    assert ganadora is not principal and principal.cerrada
+    assert ganadora.url == "https://www.loteriasdehonduras.com/"
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+from analizador import ConsultasAnalisis
+
+
+def _escribir(directorio, mes, historial, mtime):
+    directorio.mkdir(exist_ok=True)
+    archivo = directorio / f"{mes}.json"
+    with open(archivo, "w", encoding="utf-8") as f:
+        json.dump(historial, f)
+    os.utime(archivo, (mtime, mtime))
+
+
+def test_numero_se_normaliza_en_todos_los_juegos(tmp_path):
+    directorio = tmp_path / "historial"
+    _escribir(directorio, "2026-08", {
+        "2026-08-01": {"super_premio": ["07", "10", "14", "20", "22", "28"],
+                       "juga3_11am": ["007"], "diaria_11am": ["7", "León", "2X", "3"]},
+    }, 1_000_000)
+    consultas = ConsultasAnalisis(str(directorio))
+    for juego in ("super_premio", "juga3", "la_diaria"):
+        respuesta = consultas.consultar(juego, "numero", ventana=None, numero="7")
+        assert respuesta["veces"] == 1, juego
+
+
+def test_un_calculo_viejo_no_queda_en_la_cache(tmp_path, monkeypatch):
+    directorio = tmp_path / "historial"
+    _escribir(directorio, "2026-08", {"2026-08-01": {"pega_3_11am": ["01", "02", "03"]}}, 1_000_000)
+    consultas = ConsultasAnalisis(str(directorio))
+
+    import analizador
+    original = analizador.extraer_sorteos_juego
+    entro, seguir = threading.Event(), threading.Event()
+
+    def lento(historial, *args):
+        if not entro.is_set():  # solo la primera consulta se queda esperando
+            entro.set()
+            seguir.wait(5)
+        return original(historial, *args)
+
+    monkeypatch.setattr(analizador, "extraer_sorteos_juego", lento)
+
+    viejo = []
+    hilo = threading.Thread(target=lambda: viejo.append(
+        consultas.consultar("pega_3", "sorteos", ventana=None)))
+    hilo.start()
+    assert entro.wait(5)
+
+    # Otra consulta recarga mientras el hilo todavía calcula sobre la versión anterior
+    _escribir(directorio, "2026-08", {"2026-08-02": {"pega_3_11am": ["04", "05", "06"]}}, 2_000_000)
+    consultas.consultar("pega_3", "frecuencias", ventana=None)
+    seguir.set()
+    hilo.join(5)
+    assert [s["fecha"] for s in viejo[0]] == ["2026-08-01"]
+
+    # Lo que el hilo viejo guardó al terminar no tapa la versión nueva
+    nuevo = consultas.consultar("pega_3", "sorteos", ventana=None)
+    assert [s["fecha"] for s in nuevo] == ["2026-08-02"]
+    assert consultas.recargas == 2
+
+
+def test_solo_lee_los_meses_que_pide_la_consulta(tmp_path, monkeypatch):
+    directorio = tmp_path / "historial"
+    for i, mes in enumerate(("2026-06", "2026-07", "2026-08")):
+        _escribir(directorio, mes, {f"{mes}-0{d}": {"pega_3_11am": ["01", "02", "03"]}
+                                    for d in range(1, 6)}, 1_000_000 + i)
+    monkeypatch.chdir(tmp_path)  # sin historial.json al lado: no hace falta
+    consultas = ConsultasAnalisis(str(directorio))
+
+    sorteos = consultas.consultar("pega_3", "sorteos", ventana=None,
+                                  desde="2026-07-03", hasta="2026-07-04")
+    assert [s["fecha"] for s in sorteos] == ["2026-07-04", "2026-07-03"]
+    assert sorted(consultas._meses) == ["2026-07"]
+
+    # Con ventana y sin rango: del mes más nuevo hacia atrás, hasta juntar los sorteos
+    sorteos = consultas.consultar("pega_3", "sorteos", ventana=7)
+    assert len(sorteos) == 7 and sorteos[-1]["fecha"] == "2026-07-04"
+    assert sorted(consultas._meses) == ["2026-07", "2026-08"]
+
+    # Cambia un mes que la consulta no usa: lo ya calculado sigue sirviendo
+    _escribir(directorio, "2026-06", {"2026-06-01": {"pega_3_11am": ["09", "09", "09"]}}, 2_000_000)
+    consultas.consultar("pega_3", "sorteos", ventana=7)
+    assert consultas.info_cache().hits == 1
+    assert consultas.recargas == 2
+
+
+def test_recargar_un_mes_no_vacia_la_cache_de_los_otros(tmp_path):
+    directorio = tmp_path / "historial"
+    _escribir(directorio, "2026-07", {"2026-07-01": {"pega_3_11am": ["01", "02", "03"]}}, 1_000_000)
+    _escribir(directorio, "2026-08", {"2026-08-01": {"pega_3_11am": ["04", "05", "06"]}}, 1_000_000)
+    consultas = ConsultasAnalisis(str(directorio))
+    julio = dict(ventana=None, desde="2026-07-01", hasta="2026-07-31")
+    agosto = dict(ventana=None, desde="2026-08-01", hasta="2026-08-31")
+
+    consultas.consultar("pega_3", "sorteos", **julio)
+    consultas.consultar("pega_3", "sorteos", **agosto)
+    _escribir(directorio, "2026-08", {"2026-08-02": {"pega_3_11am": ["07", "08", "09"]}}, 2_000_000)
+    nuevo = consultas.consultar("pega_3", "sorteos", **agosto)
+    assert [s["fecha"] for s in nuevo] == ["2026-08-02"]
+
+    consultas.consultar("pega_3", "sorteos", **julio)
+    assert consultas.info_cache().hits == 1
@@ -0,0 +1,34 @@
+import json
+
+import historial_mensual
+from indice_combinaciones import IndiceCombinaciones
+
+
+def test_sin_archivo_se_arma_desde_historial_mensual(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    historial_mensual.escribir_meses({
+        "2026-07-29": {"pega_3_9pm": ["01", "02", "03"]},
+        "2026-08-01": {"super_premio": ["04", "10", "14", "20", "22", "28"]},
+    }, {"2026-07", "2026-08"})
+
+    indice = IndiceCombinaciones.cargar("indice.json")
+    assert indice.ya_salio("pega_3", ["03", "01", "02"]) == [("2026-07-29", "pega_3_9pm", ["01", "02", "03"])]
+    assert indice.ultima_vez_juntos("super_premio", ["10", "28"])[0] == "2026-08-01"
+
+
+def test_un_sorteo_nuevo_toca_pocas_lineas(tmp_path):
+    archivo = str(tmp_path / "indice.json")
+    indice = IndiceCombinaciones()
+    for dia in range(1, 21):
+        indice.agregar(f"2026-08-{dia:02d}", "pega_3_9pm", [f"{dia:02d}", f"{dia + 20:02d}", f"{dia + 40:02d}"])
+    indice.guardar(archivo)
+    antes = open(archivo, encoding="utf-8").read().splitlines()
+
+    indice.agregar("2026-08-21", "pega_3_9pm", ["01", "02", "99"])
+    indice.guardar(archivo)
+    despues = open(archivo, encoding="utf-8").read().splitlines()
+
+    # El sorteo, los bitmaps de sus tres números y la coma de las dos líneas que dejan de ser últimas
+    assert len(set(despues) - set(antes)) <= 6
+    assert IndiceCombinaciones.cargar(archivo).ya_salio("pega_3", ["99", "01", "02"])
+    json.loads("\n".join(despues))
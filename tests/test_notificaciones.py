@@ -0,0 +1,68 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def notificaciones(servidor, monkeypatch):
+    monkeypatch.setenv("TELEGRAM_API_URL", servidor.url)
+    import notificaciones
+    modulo = importlib.reload(notificaciones)
+    monkeypatch.setattr(modulo, "ESPERA_BASE_S", 0.05)
+    yield modulo
+    monkeypatch.delenv("TELEGRAM_API_URL")
+    importlib.reload(notificaciones)
+
+
+def _notificador(modulo, archivo):
+    return modulo.Notificador("TOKEN", "42", bandeja=modulo.Bandeja(str(archivo)))
+
+
+def test_misma_clave_sale_una_sola_vez(notificaciones, servidor, tmp_path):
+    n = _notificador(notificaciones, tmp_path / "bandeja.json")
+    assert n.encolar("resumen 10:00", clave="resumen:a") == notificaciones.ENCOLADO
+    # Sin despachar todavía: misma clave, otro texto
+    assert n.encolar("resumen 10:05", clave="resumen:a") == notificaciones.EN_COLA
+    assert n.despachar() == 1
+    assert n.encolar("resumen 10:10", clave="resumen:a") == notificaciones.REPETIDO
+    assert n.despachar() == 0
+
+    enviados = servidor.de("/botTOKEN/sendMessage")
+    assert [p["cuerpo"]["text"] for p in enviados] == ["resumen 10:05"]
+    assert enviados[0]["cuerpo"]["chat_id"] == "42"
+
+
+def test_respeta_retry_after_del_429(notificaciones, servidor, tmp_path):
+    servidor.guion["/botTOKEN/"] = [
+        (429, {"ok": False, "parameters": {"retry_after": 0.5}}),
+    ]
+    n = _notificador(notificaciones, tmp_path / "bandeja.json")
+    n.encolar("alerta", clave="alerta:x")
+    assert n.despachar() == 1
+
+    pedidos = servidor.de("/botTOKEN/")
+    assert [p["codigo"] for p in pedidos] == [429, 200]
+    assert pedidos[1]["inicio"] - pedidos[0]["fin"] >= 0.5
+
+
+def test_lo_pendiente_sale_despues_de_reiniciar(notificaciones, servidor, tmp_path):
+    archivo = tmp_path / "bandeja.json"
+    servidor.guion["/botTOKEN/"] = [(500, {"ok": False})]
+
+    primera = _notificador(notificaciones, archivo)
+    primera.encolar("alerta", clave="alerta:x")
+    # Sin plazo para reintentar: queda en la bandeja en disco
+    assert primera.despachar(plazo=0.01) == 0
+    assert len(primera.bandeja.pendientes) == 1
+
+    # Otro proceso, misma bandeja: lo manda sin que nadie lo vuelva a encolar
+    segunda = _notificador(notificaciones, archivo)
+    assert len(segunda.bandeja.pendientes) == 1
+    assert segunda.encolar("alerta", clave="alerta:x") == notificaciones.EN_COLA
+    assert segunda.despachar() == 1
+    assert [p["codigo"] for p in servidor.de("/botTOKEN/")] == [500, 200]
+
+    tercera = _notificador(notificaciones, archivo)
+    assert tercera.bandeja.pendientes == []
+    assert tercera.encolar("alerta", clave="alerta:x") == notificaciones.REPETIDO
+
@@ -0,0 +1,68 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def publicar(servidor, monkeypatch, tmp_path):
+    monkeypatch.setenv("CF_API_URL", servidor.url)
+    monkeypatch.setenv("CF_ZONE_ID", "zona")
+    monkeypatch.setenv("CF_TOKEN", "secreto")
+    monkeypatch.setenv("CF_PAGES_DEPLOY_HOOK", f"{servidor.url}/hook/abc")
+    monkeypatch.setenv("TELEGRAM_API_URL", servidor.url)
+    import notificaciones
+    import publicar
+    importlib.reload(notificaciones)
+    modulo = importlib.reload(publicar)
+    monkeypatch.setattr(modulo, "ESPERA_BASE_S", 0.05)
+    monkeypatch.setattr(notificaciones, "ESPERA_BASE_S", 0.05)
+    servidor.demora = 0.3
+
+    bandeja = notificaciones.Bandeja(str(tmp_path / "bandeja.json"))
+    bandeja.encolar("resumen", clave="resumen:a")
+    modulo.notificador = notificaciones.Notificador("TOKEN", "42", bandeja=bandeja)
+    yield modulo
+    for nombre in ("CF_API_URL", "TELEGRAM_API_URL"):
+        monkeypatch.delenv(nombre)
+    importlib.reload(notificaciones)
+    importlib.reload(publicar)
+
+
+def _por_nombre(destinos):
+    return {d.nombre: d for d in destinos}
+
+
+def test_purga_y_despues_despliega_con_telegram_en_paralelo(publicar, servidor):
+    servidor.guion["/hook/"] = [(503, {"ok": False})]
+    destinos = _por_nombre(publicar.publicar(True, True, publicar.notificador))
+
+    purga = servidor.de("/zones/zona/purge_cache")
+    hook = servidor.de("/hook/abc")
+    telegram = servidor.de("/botTOKEN/sendMessage")
+    assert len(purga) == 1 and len(telegram) == 1
+    # El hook nunca arranca antes de que termine el purgado, y el 503 se reintenta
+    assert [p["codigo"] for p in hook] == [503, 200]
+    assert hook[0]["inicio"] >= purga[0]["fin"]
+    # Telegram no espera al borde
+    assert telegram[0]["inicio"] < purga[0]["fin"]
+
+    assert destinos["cloudflare"].estado == "ok"
+    assert destinos["deploy_hook"].estado == "ok" and destinos["deploy_hook"].intentos == 2
+    assert destinos["telegram"].estado == "ok"
+    assert destinos["deploy_hook"].segundos >= 0.6
+
+
+def test_sin_push_no_purga_ni_despliega(publicar, servidor):
+    destinos = _por_nombre(publicar.publicar(False, False, publicar.notificador))
+    assert not servidor.de("/zones/") and not servidor.de("/hook/")
+    assert len(servidor.de("/botTOKEN/")) == 1
+    assert destinos["cloudflare"].estado == destinos["deploy_hook"].estado == "omitido"
+
+
+def test_error_definitivo_no_se_reintenta(publicar, servidor):
+    servidor.guion["/hook/"] = [(404, {"ok": False})]
+    destinos = _por_nombre(publicar.publicar(True, True, publicar.notificador))
+    assert len(servidor.de("/hook/")) == 1
+    assert destinos["deploy_hook"].estado == "error"
+    # El purgado igual salió antes
+    assert destinos["cloudflare"].estado == "ok"